@@ -1,172 +1,209 @@
 import json
-from pricing_engine import PricingEngine
+import sys
+from types import MappingProxyType
+from typing import Any
+
+from pricing_engine import Node, PricingEngine, ValidationError
 
-pricing_nodes = [
-    {
-        "path": "/material",
-        "value": "tpa",
-        "display_name": "TPA Material",
-        "type": "label",
-        "cost": 100,
-        "currency": "USD",
-        "is_available": True,
-        "version": 1,
-        "is_hidden": False,
-    },
-    {
-        "path": "/material",
-        "value": "pla",
-        "display_name": "PLA Material",
-        "type": "label",
-        "cost": 20,
-        "currency": "USD",
-        "is_available": True,
-        "version": 1,
-        "is_hidden": False,
-    },
-    {
-        "path": "/material",
-        "value": "resin",
-        "display_name": "Resin Material",
-        "type": "label",
-        "cost": 0,
-        "currency": "USD",
-        "is_available": True,
-        "version": 1,
-        "is_hidden": False,
-    },
-    {
-        "path": "/material/resin/color",
-        "value": "red",
-        "display_name": "Red",
-        "type": "label",
-        "cost": 30,
-        "currency": "USD",
-        "is_available": True,
-        "version": 1,
-        "is_hidden": False,
-    },
-    {
-        "path": "/material/resin/color",
-        "value": "blue",
-        "display_name": "Blue",
-        "type": "label",
-        "cost": 30,
-        "currency": "USD",
-        "is_available": True,
-        "version": 1,
-        "is_hidden": False,
-    },
-    {
-        "path": "/material/pla/color",
-        "value": "blue",
-        "display_name": "Blue",
-        "type": "label",
-        "cost": 300,
-        "currency": "USD",
-        "is_available": True,
-        "version": 1,
-        "is_hidden": False,
-    },
-    {
-        "path": "/volume",
-        "value": None,
-        "display_name": "Volume",
-        "type": "numeric",
-        "cost": 10,
-        "unit": "cm3",
-        "currency": "USD",
-        "is_available": True,
-        "version": 1,
-        "is_hidden": True,
-    },
-    {
-        "path": "/time_taken",
-        "value": None,
-        "display_name": "Time Taken",
-        "type": "numeric",
-        "cost": 100,
-        "currency": "USD",
-        "is_available": True,
-        "version": 1,
-        "is_hidden": True,
-    },
-]
 
-pricing_strategy = {
-    "version": 1,
-    "required_inputs": ["/volume", "/time_taken", "/material/*/color"],
-    "steps": [
+def _freeze(value: Any) -> Any:
+    """Return a deeply read-only copy: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# Configuration is frozen once at import, so the engine can safely reuse
+# work keyed on the identity of these objects across calculations.
+PRICING_NODES = _freeze(
+    [
         {
-            "id": 1,
-            "name": "Volume Cost (Explicit)",
-            "mode": "price",
-            "inputs": ["/volume"],
+            "path": "/material",
+            "value": "tpa",
+            "display_name": "TPA Material",
+            "type": "label",
+            "cost": 100,
+            "currency": "USD",
+            "is_available": True,
+            "version": 1,
+            "is_hidden": False,
         },
         {
-            "id": 2,
-            "name": "Base Cost Calculation",
-            "mode": "add",
-            "inputs": ["/volume", "/time_taken", "/material/*/color"],
+            "path": "/material",
+            "value": "pla",
+            "display_name": "PLA Material",
+            "type": "label",
+            "cost": 20,
+            "currency": "USD",
+            "is_available": True,
+            "version": 1,
+            "is_hidden": False,
         },
         {
-            "id": 3,
-            "name": "Apply Markup",
-            "mode": "multiply",
-            "inputs": [2, "step__2"],
+            "path": "/material",
+            "value": "resin",
+            "display_name": "Resin Material",
+            "type": "label",
+            "cost": 0,
+            "currency": "USD",
+            "is_available": True,
+            "version": 1,
+            "is_hidden": False,
         },
         {
-            "id": 4,
-            "name": "Conditional Pricing",
-            "mode": "if",
-            "condition": {"left": "step__3", "operator": ">", "right": 200},
-            "then": "step__3",
-            "else": 0,
+            "path": "/material/resin/color",
+            "value": "red",
+            "display_name": "Red",
+            "type": "label",
+            "cost": 30,
+            "currency": "USD",
+            "is_available": True,
+            "version": 1,
+            "is_hidden": False,
         },
         {
-            "id": 5,
-            "name": "Calculate 15% Tax",
-            "mode": "percentage",
-            "inputs": ["step__4", 15],
+            "path": "/material/resin/color",
+            "value": "blue",
+            "display_name": "Blue",
+            "type": "label",
+            "cost": 30,
+            "currency": "USD",
+            "is_available": True,
+            "version": 1,
+            "is_hidden": False,
         },
         {
-            "id": 6,
-            "name": "Total with Tax",
-            "mode": "add",
-            "inputs": ["step__4", "step__5"],
+            "path": "/material/pla/color",
+            "value": "blue",
+            "display_name": "Blue",
+            "type": "label",
+            "cost": 300,
+            "currency": "USD",
+            "is_available": True,
+            "version": 1,
+            "is_hidden": False,
         },
         {
-            "id": 7,
-            "name": "Apply Discount",
-            "mode": "subtract",
-            "inputs": ["step__6", 10],
+            "path": "/volume",
+            "value": None,
+            "display_name": "Volume",
+            "type": "numeric",
+            "cost": 10,
+            "unit": "cm3",
+            "currency": "USD",
+            "is_available": True,
+            "version": 1,
+            "is_hidden": True,
         },
         {
-            "id": 8,
-            "name": "Clamp Final Price",
-            "mode": "clamp",
-            "value": "step__7",
-            "min": 50,
-            "max": 500,
+            "path": "/time_taken",
+            "value": None,
+            "display_name": "Time Taken",
+            "type": "numeric",
+            "cost": 100,
+            "currency": "USD",
+            "is_available": True,
+            "version": 1,
+            "is_hidden": True,
         },
-    ],
-}
+    ]
+)
 
-inputs = [
-    {"path": "/volume", "value": 2},
-    {"path": "/time_taken", "value": 1},
-    {"path": "/material/resin/color", "value": "blue"},
-]
+PRICING_STRATEGY = _freeze(
+    {
+        "version": 1,
+        "required_inputs": ["/volume", "/time_taken", "/material/*/color"],
+        "steps": [
+            {
+                "id": 1,
+                "name": "Volume Cost (Explicit)",
+                "mode": "price",
+                "inputs": ["/volume"],
+            },
+            {
+                "id": 2,
+                "name": "Base Cost Calculation",
+                "mode": "add",
+                "inputs": ["/volume", "/time_taken", "/material/*/color"],
+            },
+            {
+                "id": 3,
+                "name": "Apply Markup",
+                "mode": "multiply",
+                "inputs": [2, "step__2"],
+            },
+            {
+                "id": 4,
+                "name": "Conditional Pricing",
+                "mode": "if",
+                "condition": {"left": "step__3", "operator": ">", "right": 200},
+                "then": "step__3",
+                "else": 0,
+            },
+            {
+                "id": 5,
+                "name": "Calculate 15% Tax",
+                "mode": "percentage",
+                "inputs": ["step__4", 15],
+            },
+            {
+                "id": 6,
+                "name": "Total with Tax",
+                "mode": "add",
+                "inputs": ["step__4", "step__5"],
+            },
+            {
+                "id": 7,
+                "name": "Apply Discount",
+                "mode": "subtract",
+                "inputs": ["step__6", 10],
+            },
+            {
+                "id": 8,
+                "name": "Clamp Final Price",
+                "mode": "clamp",
+                "value": "step__7",
+                "min": 50,
+                "max": 500,
+            },
+        ],
+    }
+)
+
+# Engine-side node records: only the fields used for pricing, in slotted objects
+NODES = tuple(map(Node.from_mapping, PRICING_NODES))
+
+# Inputs keyed by path, so the engine resolves each one with a single lookup
+INPUTS = _freeze(
+    {
+        "/volume": 2,
+        "/time_taken": 1,
+        "/material/resin/color": "blue",
+    }
+)
 
 # Create pricing engine instance
 engine = PricingEngine()
 
-# Calculate pricing (pass pricing_nodes as list, not dict)
-try:
-    result_output = engine.calculate(pricing_nodes, pricing_strategy, inputs)
-except ValueError as e:
-    print(f"Error: {e}")
-    result_output = {"error": str(e)}
+# Compile the strategy once; reuse the result for every calculation
+COMPILED_STRATEGY = engine.compile_strategy(PRICING_STRATEGY)
+
+# Index the catalog once; calculations with the same NODES object reuse it
+engine.precompute_indexes(NODES)
+
+# Calculate pricing (pass pricing nodes as a sequence, not dict). Invalid
+# inputs and step errors, e.g. division by zero, are returned, not raised
+result = engine.try_calculate(NODES, COMPILED_STRATEGY, INPUTS)
+if isinstance(result, ValidationError):
+    print(f"Error: {result.message}")
+    result_output = {"error": result.message}
+else:
+    result_output = result
 
-# Display result
-print(json.dumps(result_output, indent=2))
+# Display result (pass --compact to skip indentation when piping output)
+if "--compact" in sys.argv[1:]:
+    print(json.dumps(result_output, separators=(",", ":")))
+else:
+    print(json.dumps(result_output, indent=2))
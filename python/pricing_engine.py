@@ -1,5 +1,25 @@
+import marshal
 import re
-from typing import List, Optional, Union, Tuple, TypedDict, NotRequired, Any
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from operator import eq, ge, gt, le, lt, mul, ne, sub, truediv
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Union,
+    Tuple,
+    TypedDict,
+    NotRequired,
+    NamedTuple,
+    Sequence,
+    Any,
+)
 
 
 # Type Definitions
@@ -21,6 +41,63 @@ class PricingNode(TypedDict):
     ]  # Required for label type, None for numeric
 
 
+@dataclass(frozen=True, slots=True)
+class Node:
+    """Compact, immutable pricing node.
+
+    Holds only the fields used by the engine, in slots rather than a per-node
+    dict, and is hashable. Supports the read-only item access the engine uses
+    for ``PricingNode`` dicts, so both can be mixed freely. A ``None`` unit or
+    currency means the node has none.
+    """
+
+    path: str
+    type: str  # "numeric" or "label"
+    cost: Union[int, float]
+    value: Optional[Union[str, int, float]] = None
+    unit: Optional[str] = None
+    currency: Optional[str] = None
+
+    @classmethod
+    def from_mapping(cls, node: PricingNode) -> "Node":
+        """Build a node from a ``PricingNode`` dict, dropping unused fields."""
+        return cls(
+            node["path"],
+            node["type"],
+            node["cost"],
+            node.get("value"),
+            node.get("unit"),
+            node.get("currency"),
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _NODE_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in _NODE_FIELDS else None
+        return default if value is None else value
+
+
+_NODE_FIELDS = frozenset(Node.__slots__)
+
+
+class PricingNodeColumns(TypedDict):
+    """Pricing nodes in column-oriented (struct-of-arrays) form.
+
+    Each key maps to a list with one entry per node, e.g. as produced by a
+    columnar database fetch. A ``None`` unit or currency means the node has none.
+    """
+
+    path: List[str]
+    type: List[str]
+    cost: List[Union[int, float]]
+    value: NotRequired[List[Optional[Union[str, int, float]]]]
+    unit: NotRequired[List[Optional[str]]]
+    currency: NotRequired[List[Optional[str]]]
+
+
 class Input(TypedDict):
     """User input for pricing calculation."""
 
@@ -135,7 +212,12 @@ class PricingStrategy(TypedDict):
 
 
 class BreakdownEntry(TypedDict):
-    """Breakdown entry in the calculation result."""
+    """Breakdown entry in the calculation result.
+
+    Entries are plain dicts copied from a per-operation template, so they are
+    cheap to create and serialize as JSON objects.
+    Pass ``return_breakdown=False`` to ``calculate`` to skip them entirely.
+    """
 
     step_id: int
     name: str
@@ -153,6 +235,409 @@ class CalculationResult(TypedDict):
     breakdown: List[BreakdownEntry]
 
 
+@dataclass(frozen=True, slots=True)
+class ValidationError:
+    """Invalid request reported by ``PricingEngine.validate`` or ``try_calculate``.
+
+    Returned rather than raised; ``message`` is the text of the ValueError
+    ``calculate`` raises for the same request.
+    """
+
+    message: str
+
+
+class CompiledSelector(NamedTuple):
+    """Wildcard path selector with its regex compiled ahead of time.
+
+    Produced by ``compile_selectors`` and accepted anywhere a wildcard string
+    is, so the engine can match paths without re-parsing the pattern.
+    """
+
+    pattern: str
+    regex: re.Pattern
+    segments: Optional[Tuple[str, ...]]  # None when only the regex can match it
+    prefix: Optional[str]  # Text around a single "*"; None when the regex is needed
+    suffix: str
+
+    def match(self, path: str) -> bool:
+        """Check whether a path matches the selector.
+
+        Selectors with a single ``*`` between literal text are checked with
+        string comparisons; all others fall back to the regex.
+
+        Args:
+            path: Path to test
+
+        Returns:
+            True if the path matches
+        """
+        prefix = self.prefix
+        if prefix is None or path.endswith("\n"):
+            # "$" also matches before a final newline; leave that to the regex
+            return self.regex.match(path) is not None
+        end = len(path) - len(self.suffix)
+        return (
+            end > len(prefix)
+            and path.startswith(prefix)
+            and path.endswith(self.suffix)
+            and "/" not in path[len(prefix) : end]
+        )
+
+
+# Characters that give a selector segment regex meaning beyond a literal match
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+@lru_cache(maxsize=1024)
+def _compile_selector(pattern: str) -> CompiledSelector:
+    """Compile a wildcard pattern once per process.
+
+    Every match site goes through this cache, so engines created per request
+    still share compiled patterns.
+
+    A ``*`` matches exactly one path segment, e.g. "/material/*/color".
+    Patterns made of literal segments and whole-segment ``*`` also get their
+    split form so they can be resolved through a ``PathTrie``. Segments are
+    interned like the trie's keys, so descending a level is an identity match.
+    """
+    regex_str = "^" + pattern.replace("*", "[^/]+") + "$"
+    segments: Optional[Tuple[str, ...]] = tuple(map(sys.intern, pattern.split("/")))
+    if any(seg != "*" and not _REGEX_METACHARS.isdisjoint(seg) for seg in segments):
+        segments = None
+
+    prefix, star, suffix = pattern.partition("*")
+    if not star or not _REGEX_METACHARS.isdisjoint(prefix + suffix):
+        prefix, suffix = None, ""
+    return CompiledSelector(pattern, re.compile(regex_str), segments, prefix, suffix)
+
+
+class PathTrie:
+    """Trie of pricing nodes keyed by path segment.
+
+    Wildcard lookups descend one child per literal segment and only branch
+    at ``*`` segments, so their cost scales with the number of matches
+    rather than with the size of the catalog.
+    """
+
+    __slots__ = ("children", "nodes")
+
+    def __init__(self) -> None:
+        self.children: dict[str, "PathTrie"] = {}
+        self.nodes: List[PricingNode] = []
+
+    def insert(self, path_segments: List[str], node: PricingNode) -> None:
+        """Add a node under the given path segments.
+
+        Args:
+            path_segments: The node path split on "/"
+            node: Pricing node to store at the leaf
+        """
+        trie = self
+        for segment in path_segments:
+            child = trie.children.get(segment)
+            if child is None:
+                child = trie.children[sys.intern(segment)] = PathTrie()
+            trie = child
+        trie.nodes.append(node)
+
+        # A selector regex ends in "$", which also matches before a final newline
+        if path_segments and path_segments[-1].endswith("\n"):
+            self.insert([*path_segments[:-1], path_segments[-1][:-1]], node)
+
+    def glob(self, segments: Tuple[str, ...], depth: int = 0) -> Iterator[PricingNode]:
+        """Yield all nodes whose path matches the segments.
+
+        Args:
+            segments: Selector split on "/", where "*" matches any one non-empty segment
+            depth: Index of the segment matched at this level
+
+        Yields:
+            Matching pricing nodes
+        """
+        if depth == len(segments):
+            yield from self.nodes
+            return
+        segment = segments[depth]
+        if segment == "*":
+            for key, child in self.children.items():
+                if key:
+                    yield from child.glob(segments, depth + 1)
+        else:
+            child = self.children.get(segment)
+            if child is not None:
+                yield from child.glob(segments, depth + 1)
+
+
+# Kinds of Ref, i.e. how a bound operand is read
+_REF_CONST = 0  # key is the literal value
+_REF_STEP = 1  # key is the result slot of the referenced step
+_REF_PATH = 2  # key is the input path
+_REF_WILDCARD = 3  # key is the wildcard pattern or CompiledSelector
+_REF_RAW = 4  # key is an operand resolved as-is, e.g. a malformed step__ reference
+
+
+class Ref:
+    """Step operand bound at compile time.
+
+    Its ``kind`` says how the operand is read, so resolving it takes one
+    attribute load and an integer comparison rather than type and prefix checks.
+    """
+
+    __slots__ = ("kind", "key")
+
+    def __init__(self, kind: int, key: Any) -> None:
+        self.kind = kind
+        self.key = key
+
+    def __repr__(self) -> str:
+        return f"Ref({self.kind}, {self.key!r})"
+
+
+@dataclass(frozen=True, slots=True)
+class _BoundClamp:
+    """Clamp step with its operands bound at compile time."""
+
+    id: Any
+    value: Ref
+    min: Ref
+    max: Ref
+    check_range: bool  # False when constant bounds are known to be ordered
+
+
+@dataclass(frozen=True, slots=True)
+class _BoundIf:
+    """If step with its condition and branches bound at compile time."""
+
+    id: Any
+    left: Ref
+    right: Ref
+    operator: Any
+    compare: Optional[Callable[[Any, Any], Any]]  # None looks up OPERATORS
+    then: Ref
+    otherwise: Ref
+
+
+# Compiled step: (engine, step_values, final_cost_by_path, input_values,
+# emit_breakdown) -> (result, breakdown)
+StepOp = Callable[
+    ["PricingEngine", list, dict, dict, bool],
+    Tuple[Union[int, float], Optional[BreakdownEntry]],
+]
+
+
+class CompiledStrategy(NamedTuple):
+    """Strategy lowered to a chain of pre-bound step operations.
+
+    Produced by ``PricingEngine.compile_strategy``. Step results live in a
+    list with one slot per step id or referenced id, initialized to 0.
+    """
+
+    strategy: PricingStrategy
+    ops: Tuple[StepOp, ...]
+    slots: dict[Any, int]  # step id -> result slot
+    targets: Tuple[Optional[int], ...]  # result slot per step; None if malformed
+    visible: Tuple[bool, ...]  # per step, whether it appears in the breakdown
+    visible_count: int  # number of breakdown entries of a calculation
+    has_price_mode: bool  # whether any step reads raw input values
+    # Per step, what its memoized results are keyed on; see _step_cache_key
+    cache_keys: Tuple[Optional[tuple], ...]
+    # One alternation over the plain required input patterns, see _compile_required
+    required_regex: Optional[re.Pattern]
+    required_groups: Tuple[Optional[str], ...]  # group per required input, if any
+    required_paths: Tuple[Optional[str], ...]  # per required input, if a plain path
+
+
+def _compile_required(
+    required_inputs: Any,
+) -> Tuple[Optional[re.Pattern], Tuple[Optional[str], ...], Tuple[Optional[str], ...]]:
+    """Combine required input patterns into one regex with a group per pattern.
+
+    Patterns made of literal text and ``*`` are combined; plain paths without
+    ``*`` are left out, as they are found by lookup. Others keep their own
+    regex, so an invalid one still fails only when it is checked.
+
+    Args:
+        required_inputs: The strategy's required_inputs list
+
+    Returns:
+        Tuple of (combined regex or None, group name per required input or
+        None for inputs left out of the regex, path per required input that
+        is a plain path or None)
+    """
+    if not isinstance(required_inputs, (list, tuple)):
+        return None, (), ()
+    branches: List[str] = []
+    groups: List[Optional[str]] = []
+    paths: List[Optional[str]] = []
+    for index, required_pattern in enumerate(required_inputs):
+        if isinstance(required_pattern, CompiledSelector):
+            required_pattern = required_pattern.pattern
+        if not isinstance(required_pattern, str) or not _REGEX_METACHARS.isdisjoint(
+            required_pattern.replace("*", "")
+        ):
+            groups.append(None)
+            paths.append(None)
+            continue
+        if "*" not in required_pattern:
+            groups.append(None)
+            paths.append(required_pattern)
+            continue
+        group = f"r{index}"
+        regex_str = "^" + required_pattern.replace("*", "[^/]+") + "$"
+        branches.append(f"(?P<{group}>{regex_str})")
+        groups.append(group)
+        paths.append(None)
+    if not branches:
+        return None, tuple(groups), tuple(paths)
+    return re.compile("|".join(branches)), tuple(groups), tuple(paths)
+
+
+def _nodes_from_columns(columns: PricingNodeColumns) -> List[Node]:
+    """Build node records from a column-oriented node table.
+
+    Only the fields used by the engine are copied into slotted ``Node``
+    records, so they stay small even when the source catalog carries display
+    metadata.
+
+    Args:
+        columns: Column-oriented pricing nodes
+
+    Returns:
+        List of pricing nodes, in row order
+
+    Raises:
+        ValueError: If a column's length differs from the path column's
+    """
+    paths = columns["path"]
+    count = len(paths)
+    values = columns.get("value") or [None] * count
+    units = columns.get("unit") or [None] * count
+    currencies = columns.get("currency") or [None] * count
+    node_columns = (paths, columns["type"], columns["cost"], values, units, currencies)
+
+    # map() stops at the shortest column, which would drop nodes silently
+    for name, column in zip(Node.__slots__, node_columns):
+        if len(column) != count:
+            raise ValueError(
+                f"Pricing node column '{name}' has {len(column)} entries, "
+                f"expected {count} (one per path)"
+            )
+    return list(map(Node, *node_columns))
+
+
+def _columns_from_table(table: Any) -> PricingNodeColumns:
+    """Extract the node columns used by the engine from an Arrow table.
+
+    Works on anything exposing ``column_names`` and ``column(name).to_pylist()``
+    (``pyarrow.Table``), so the engine doesn't import pyarrow. Display columns
+    are never converted.
+
+    Args:
+        table: Table with at least path, type and cost columns
+
+    Returns:
+        Column-oriented pricing nodes
+    """
+    names = set(table.column_names)
+    return {
+        name: table.column(name).to_pylist()
+        for name in ("path", "type", "cost", "value", "unit", "currency")
+        if name in names
+    }
+
+
+def compile_selectors(pricing_strategy: PricingStrategy) -> PricingStrategy:
+    """Return a copy of a strategy with its wildcard selectors precompiled.
+
+    Wildcard strings in ``required_inputs`` and in each step's ``inputs`` are
+    replaced by ``CompiledSelector`` objects. Price steps are left untouched as
+    they take a literal path. The original strategy is not modified.
+
+    Args:
+        pricing_strategy: Strategy configuration as passed to ``calculate``
+
+    Returns:
+        Strategy that can be reused across ``calculate`` calls
+    """
+
+    def compile_item(item: Any) -> Any:
+        if isinstance(item, str) and "*" in item and not item.startswith("step__"):
+            return _compile_selector(item)
+        return item
+
+    compiled: PricingStrategy = dict(pricing_strategy)
+    if "required_inputs" in pricing_strategy:
+        compiled["required_inputs"] = [
+            compile_item(p) for p in pricing_strategy["required_inputs"]
+        ]
+
+    steps = []
+    for step in pricing_strategy["steps"]:
+        if "inputs" in step and step["mode"] != "price":
+            step = {**step, "inputs": [compile_item(i) for i in step["inputs"]]}
+        steps.append(step)
+    compiled["steps"] = steps
+    return compiled
+
+
+def _copy_config(value: Any) -> Any:
+    """Deep-copy JSON-like configuration into plain dicts and lists.
+
+    Read-only mappings (e.g. ``MappingProxyType``) and tuples are thawed, so the
+    copy is independent of later changes to the original. Other values,
+    including ``CompiledSelector``, are immutable and shared.
+    """
+    if isinstance(value, Mapping):
+        return {k: _copy_config(v) for k, v in value.items()}
+    if type(value) in (list, tuple):
+        return [_copy_config(v) for v in value]
+    return value
+
+
+def _is_frozen_catalog(pricing_nodes: Any) -> bool:
+    """Tell whether a nodes object can't be changed in place between calls.
+
+    Only tuples of ``Node`` records and Arrow tables qualify. Node dicts can be
+    edited even inside a tuple or a read-only mapping, so catalogs holding
+    them aren't reused.
+    """
+    if isinstance(pricing_nodes, tuple):
+        return all(isinstance(node, Node) for node in pricing_nodes)
+    return hasattr(pricing_nodes, "column_names")
+
+
+def _breakdown_template(operation: str) -> BreakdownEntry:
+    """Return a breakdown entry for an operation, with its other fields empty.
+
+    Every field is assigned after copying, so entries keep the template's key
+    order; only the operation is shared.
+    """
+    return {
+        "step_id": None,
+        "name": "",
+        "operation": operation,
+        "description": "",
+        "inputs": [],
+        "calculation": "",
+        "result": 0,
+    }
+
+
+# OPTIMIZATION: Copying a small template dict and assigning its fields is
+# cheaper than building each breakdown entry from a seven-key literal
+_ADDITION_BREAKDOWN = _breakdown_template("Addition")
+_SUBTRACTION_BREAKDOWN = _breakdown_template("Subtraction")
+_MULTIPLICATION_BREAKDOWN = _breakdown_template("Multiplication")
+_DIVISION_BREAKDOWN = _breakdown_template("Division")
+_MINIMUM_BREAKDOWN = _breakdown_template("Minimum")
+_MAXIMUM_BREAKDOWN = _breakdown_template("Maximum")
+_PERCENTAGE_BREAKDOWN = _breakdown_template("Percentage")
+_ROUND_BREAKDOWN = _breakdown_template("Round")
+_CLAMP_BREAKDOWN = _breakdown_template("Clamp")
+_CONDITIONAL_BREAKDOWN = _breakdown_template("Conditional")
+_PRICE_CALCULATION_BREAKDOWN = _breakdown_template("Price Calculation")
+
+
 class PricingEngine:
     """
     A production-ready pricing calculation engine that processes complex pricing strategies.
@@ -167,6 +652,7 @@ class PricingEngine:
         - Comprehensive error messages with validation
         - O(1) node lookups using optimized indexing
         - Regex caching for efficient pattern matching
+        - Strategies compiled once to pre-bound step operations
 
     Example:
         >>> engine = PricingEngine()
@@ -200,26 +686,85 @@ class PricingEngine:
         - **if**: Conditional operation with then/else branches
     """
 
-    # Operator mapping for conditions
+    # Operator mapping for conditions; may be replaced per engine instance
+    # OPTIMIZATION: C comparison functions instead of lambdas, bound per step
+    # when the strategy is compiled
     OPERATORS: dict[str, callable] = {
-        ">": lambda a, b: a > b,
-        "<": lambda a, b: a < b,
-        ">=": lambda a, b: a >= b,
-        "<=": lambda a, b: a <= b,
-        "==": lambda a, b: a == b,
-        "!=": lambda a, b: a != b,
+        ">": gt,
+        "<": lt,
+        ">=": ge,
+        "<=": le,
+        "==": eq,
+        "!=": ne,
     }
 
-    def __init__(self, calc_rounding_decimals: int = 2) -> None:
+    # Modes whose step only operates on its resolved inputs list
+    _INPUT_MODES = frozenset(
+        {"add", "subtract", "multiply", "divide", "min", "max", "percentage", "round"}
+    )
+
+    # Number of compiled strategies kept per engine, by content
+    _COMPILED_CACHE_SIZE = 128
+
+    # Number of memoized step results kept when cache_steps is enabled
+    _STEP_CACHE_SIZE = 1024
+
+    # Number of formatted floats kept before the formatting cache is cleared
+    _FORMAT_CACHE_SIZE = 4096
+
+    def __init__(
+        self, calc_rounding_decimals: int = 2, cache_steps: bool = False
+    ) -> None:
         """Initialize the pricing engine.
 
         Args:
            calc_rounding_decimals: Number of decimal places for rounding in breakdown.
                                    Set to -1 to disable rounding. Default is 2.
+           cache_steps: Memoize step results across calculate() calls. Useful when
+                        the same strategy is priced repeatedly and only a few
+                        inputs change between calls. The least recently used
+                        results are dropped beyond 1024 entries. Default is False.
         """
         self.calc_rounding_decimals = calc_rounding_decimals
-        """Initialize the pricing engine with an empty regex cache for wildcard pattern matching."""
-        self._regex_cache: dict[str, re.Pattern] = {}
+        # float -> formatted string, reset for every calculate/calculate_batch call
+        self._format_cache: dict[float, str] = {}
+        # Immutable nodes object the current indexes were built from, if any
+        self._indexed_for: Any = None
+        # OPERATORS table the cached strategies below were compiled with
+        self._compiled_operators = self.OPERATORS
+        # Serialized strategy -> compiled strategy, least recently used first
+        self._compiled_cache: OrderedDict[Union[bytes, str], CompiledStrategy] = (
+            OrderedDict()
+        )
+        # fingerprint -> (result, breakdown_entry, referenced paths), LRU first
+        self._step_cache: Optional[
+            OrderedDict[
+                tuple, Tuple[Union[int, float], Optional[BreakdownEntry], tuple]
+            ]
+        ] = (OrderedDict() if cache_steps else None)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop memoized step results that depend on an input path.
+
+        Cached entries are keyed by the values a step reads, so they never go
+        stale; this only frees memory or forces recomputation.
+
+        Args:
+            path: Input path whose dependent steps should be dropped, matched
+                  against the literal and wildcard references of each step.
+                  Clears the whole cache when omitted.
+        """
+        if self._step_cache is None:
+            return
+        if path is None:
+            self._step_cache.clear()
+            return
+        for key, (_, _, refs) in list(self._step_cache.items()):
+            if any(
+                ref == path or (isinstance(ref, CompiledSelector) and ref.match(path))
+                for ref in refs
+            ):
+                del self._step_cache[key]
 
     def _format_number(self, value: Union[int, float]) -> str:
         """Format a number for display in calculation breakdown.
@@ -230,15 +775,39 @@ class PricingEngine:
         Returns:
             Formatted string representation
         """
-        if self.calc_rounding_decimals == -1:
+        decimals = self.calc_rounding_decimals
+        if decimals == -1:
             return str(value)
-        return str(round(value, self.calc_rounding_decimals))
+        value_type = type(value)
+        if value_type is int and type(decimals) is int and decimals >= 0:
+            # OPTIMIZATION: Rounding an int to whole or finer digits is a no-op
+            return str(value)
+        if value_type is float:
+            # OPTIMIZATION: Repeated floats reuse their string within a calculate
+            # or calculate_batch call. Keyed by value, so zeros are left out:
+            # -0.0 == 0.0 but prints "-0.0"
+            cache = self._format_cache
+            formatted = cache.get(value)
+            if formatted is None:
+                if value.is_integer() and type(decimals) is int and decimals >= 0:
+                    formatted = str(value)
+                else:
+                    formatted = str(round(value, decimals))
+                if value:
+                    if len(cache) >= self._FORMAT_CACHE_SIZE:
+                        cache.clear()
+                    cache[value] = formatted
+            return formatted
+        return str(round(value, decimals))
 
     def calculate(
         self,
-        pricing_nodes: Union[List[PricingNode], dict],
-        pricing_strategy: PricingStrategy,
-        inputs: List[Input],
+        pricing_nodes: Union[
+            Sequence[Union[PricingNode, Node]], dict, PricingNodeColumns
+        ],
+        pricing_strategy: Union[PricingStrategy, "CompiledStrategy"],
+        inputs: Union[Sequence[Input], Mapping[str, Any]],
+        return_breakdown: bool = True,
     ) -> CalculationResult:
         """
         Calculate pricing based on nodes, strategy, and user inputs.
@@ -247,15 +816,29 @@ class PricingEngine:
         processes each step in the strategy, and returns a detailed breakdown.
 
         Args:
-            pricing_nodes: List of pricing node configurations or dict mapping paths to nodes.
+            pricing_nodes: List or tuple of pricing node configurations (dicts or
+                ``Node`` records), dict mapping paths to nodes, or a column-oriented
+                ``PricingNodeColumns`` table or Arrow table with the same columns.
                 Each node defines a cost for a specific path and value combination.
+                A tuple of ``Node`` records or an Arrow table is indexed once and
+                reused while the same object is passed; other catalogs may be
+                edited between calls and are indexed on every call.
             pricing_strategy: Strategy configuration containing:
                 - version: Strategy version number
                 - required_inputs: Optional list of required input paths (supports wildcards)
                 - steps: List of calculation steps to execute in order
-            inputs: List of user inputs, each containing:
+                Strategies returned by ``compile_selectors`` and ``compile_strategy``
+                are accepted as well. Strategies with the same content as a
+                recently used one reuse its compiled form; pass the result of
+                ``compile_strategy`` to skip matching the content.
+            inputs: List or tuple of user inputs, each containing:
                 - path: The configuration path (e.g., "/material" or "/volume")
                 - value: The selected/provided value for that path
+                A mapping of path to value (e.g. ``{"/volume": 5}``) is accepted
+                as well and is used directly for lookups without conversion.
+            return_breakdown: Build the per-step breakdown. Pass False when only the
+                final price is needed, e.g. for bulk pricing; steps then skip all
+                description and calculation formatting and breakdown is empty.
 
         Returns:
             A dictionary containing:
@@ -284,47 +867,324 @@ class PricingEngine:
             >>> result["final_price"]
             50
         """
-        # Store pricing nodes as list for lookups
-        if isinstance(pricing_nodes, list):
-            self.pricing_nodes_list = pricing_nodes
-        else:
-            # If dict is provided, convert to list
-            self.pricing_nodes_list = list(pricing_nodes.values())
+        self._format_cache = {}
+
+        compiled = self._load(pricing_nodes, pricing_strategy)
+        input_values, final_cost_by_path, error = self._check_inputs(compiled, inputs)
+        if error is not None:
+            raise ValueError(error)
+        return self._evaluate(
+            compiled, input_values, final_cost_by_path, return_breakdown
+        )
 
-        # OPTIMIZATION: Create indexes for faster lookups
-        self._index_nodes_by_path()
+    def try_calculate(
+        self,
+        pricing_nodes: Union[
+            Sequence[Union[PricingNode, Node]], dict, PricingNodeColumns
+        ],
+        pricing_strategy: Union[PricingStrategy, "CompiledStrategy"],
+        inputs: Union[Sequence[Input], Mapping[str, Any]],
+        return_breakdown: bool = True,
+    ) -> Union[CalculationResult, ValidationError]:
+        """Calculate pricing, returning errors instead of raising them.
+
+        Takes the same arguments as ``calculate`` and runs its checks once, so
+        requests need no separate ``validate`` call. Use it where invalid
+        requests are routine.
 
-        # Validate required inputs
-        self._validate_required_inputs(pricing_strategy, inputs)
+        Args:
+            pricing_nodes: Pricing nodes, in any form accepted by ``calculate``
+            pricing_strategy: Strategy, in any form accepted by ``calculate``
+            inputs: User inputs, in any form accepted by ``calculate``
+            return_breakdown: Build the per-step breakdown
 
-        # Calculate final input costs
-        final_cost_by_path = self._calculate_input_costs(inputs)
+        Returns:
+            The result ``calculate`` would return, or a ``ValidationError``
+            carrying the message of the ValueError it would raise, e.g. for a
+            missing input or a division by zero
+        """
+        self._format_cache = {}
 
-        # Apply pricing strategy steps
-        step_values = {}
-        breakdown = []
+        try:
+            compiled = self._load(pricing_nodes, pricing_strategy)
+            input_values, final_cost_by_path, error = self._check_inputs(
+                compiled, inputs
+            )
+            if error is None:
+                return self._evaluate(
+                    compiled, input_values, final_cost_by_path, return_breakdown
+                )
+        except ValueError as exc:
+            # Raised by steps, e.g. division by zero, or by malformed nodes
+            error = str(exc)
+        return ValidationError(error)
 
-        # Create map of raw input values for reference in steps (e.g. price mode)
-        input_values = {i["path"]: i.get("value") for i in inputs}
+    def calculate_batch(
+        self,
+        pricing_nodes: Union[
+            Sequence[Union[PricingNode, Node]], dict, PricingNodeColumns
+        ],
+        pricing_strategy: Union[PricingStrategy, "CompiledStrategy"],
+        inputs_batch: Iterable[Union[Sequence[Input], Mapping[str, Any]]],
+        return_breakdown: bool = True,
+    ) -> List[CalculationResult]:
+        """Calculate pricing for many input sets against the same nodes and strategy.
+
+        Nodes are indexed and the strategy is compiled once for the whole
+        batch instead of once per quote.
+
+        Args:
+            pricing_nodes: Pricing nodes, in any form accepted by ``calculate``
+            pricing_strategy: Strategy, in any form accepted by ``calculate``
+            inputs_batch: User input sets, each in any form accepted by ``calculate``
+            return_breakdown: Build the per-step breakdown of every result
+
+        Returns:
+            One result per input set, in order
 
-        for step in pricing_strategy["steps"]:
-            result, breakdown_entry = self._process_step(
-                step, step_values, final_cost_by_path, input_values
+        Raises:
+            ValueError: For the first input set that ``calculate`` would reject.
+                Use ``validate`` to screen input sets without raising.
+        """
+        # OPTIMIZATION: Formatted numbers are shared by all quotes of the batch
+        self._format_cache = {}
+
+        compiled = self._load(pricing_nodes, pricing_strategy)
+        results: List[CalculationResult] = []
+        # OPTIMIZATION: Bound once for the whole batch
+        check_inputs = self._check_inputs
+        evaluate = self._evaluate
+        append = results.append
+        for inputs in inputs_batch:
+            input_values, final_cost_by_path, error = check_inputs(compiled, inputs)
+            if error is not None:
+                raise ValueError(error)
+            append(
+                evaluate(compiled, input_values, final_cost_by_path, return_breakdown)
             )
-            step_values[step["id"]] = result
-            if not step.get("is_hidden", False):
-                breakdown.append(breakdown_entry)
+        return results
+
+    def _evaluate(
+        self,
+        compiled: CompiledStrategy,
+        input_values: Mapping[str, Any],
+        final_cost_by_path: dict[str, Union[int, float]],
+        return_breakdown: bool,
+    ) -> CalculationResult:
+        """Run the steps of a compiled strategy on checked inputs.
+
+        Args:
+            compiled: Compiled strategy
+            input_values: Raw input values by path
+            final_cost_by_path: Dictionary of calculated costs by path
+            return_breakdown: Build the per-step breakdown
+
+        Returns:
+            Final price and breakdown, as returned by ``calculate``
+        """
+        pricing_strategy = compiled.strategy
+        # Input path -> position, built on first use by wildcard resolution
+        self._input_positions: Optional[dict[str, int]] = None
+
+        # Apply pricing strategy steps
+        # OPTIMIZATION: Results are kept in slots, so step__N reads are list indexing
+        step_values = [0] * len(compiled.slots)
+
+        if not return_breakdown and self._step_cache is None:
+            # OPTIMIZATION: Without a breakdown, only results are kept; every
+            # step already returns (result, None)
+            for op, slot in zip(compiled.ops, compiled.targets):
+                step_values[slot] = op(
+                    self, step_values, final_cost_by_path, input_values, False
+                )[0]
+            if pricing_strategy["steps"]:
+                return {
+                    "final_price": step_values[compiled.targets[-1]],
+                    "breakdown": [],
+                }
+            return {"final_price": 0, "breakdown": []}
+
+        # OPTIMIZATION: The breakdown is sized up front and filled by position
+        breakdown = [None] * compiled.visible_count if return_breakdown else []
+        position = 0
+        step_cache = self._step_cache
+        for step_key, op, slot, visible in zip(
+            compiled.cache_keys, compiled.ops, compiled.targets, compiled.visible
+        ):
+            # OPTIMIZATION: Hidden steps skip building a breakdown entry
+            emit = return_breakdown and visible
+            if step_cache is None:
+                result, breakdown_entry = op(
+                    self, step_values, final_cost_by_path, input_values, emit
+                )
+            else:
+                result, breakdown_entry = self._process_step_cached(
+                    step_key,
+                    op,
+                    compiled.slots,
+                    step_values,
+                    final_cost_by_path,
+                    input_values,
+                    emit,
+                )
+            step_values[slot] = result
+            if emit:
+                breakdown[position] = breakdown_entry
+                position += 1
 
         # Get final price (last step's value)
-        # BUGFIX: Use the last step's actual ID instead of len(step_values)
+        # BUGFIX: Use the last step's actual ID (its slot) instead of len(step_values)
         if pricing_strategy["steps"]:
-            last_step_id = pricing_strategy["steps"][-1]["id"]
-            final_price = step_values.get(last_step_id)
+            final_price = step_values[compiled.targets[-1]]
         else:
             final_price = 0
 
         return {"final_price": final_price, "breakdown": breakdown}
 
+    def validate(
+        self,
+        pricing_nodes: Union[
+            Sequence[Union[PricingNode, Node]], dict, PricingNodeColumns
+        ],
+        pricing_strategy: Union[PricingStrategy, "CompiledStrategy"],
+        inputs: Union[Sequence[Input], Mapping[str, Any]],
+    ) -> Optional[ValidationError]:
+        """Check a request without calculating it or raising for invalid input.
+
+        Runs the checks ``calculate`` performs before evaluating any step:
+        required inputs, duplicate inputs, unknown paths and invalid values.
+        Use it where invalid requests are routine, so they are reported without
+        exception handling. Errors that only occur while evaluating steps, such
+        as a division by zero, are still raised by ``calculate``.
+
+        Args:
+            pricing_nodes: Pricing nodes, in any form accepted by ``calculate``
+            pricing_strategy: Strategy, in any form accepted by ``calculate``
+            inputs: User inputs, in any form accepted by ``calculate``
+
+        Returns:
+            None if the request is valid, otherwise a ``ValidationError``
+            carrying the message ``calculate`` would raise
+        """
+        compiled = self._load(pricing_nodes, pricing_strategy)
+        error = self._check_inputs(compiled, inputs)[2]
+        return None if error is None else ValidationError(error)
+
+    def _load(
+        self,
+        pricing_nodes: Union[
+            Sequence[Union[PricingNode, Node]], dict, PricingNodeColumns
+        ],
+        pricing_strategy: Union[PricingStrategy, "CompiledStrategy"],
+    ) -> CompiledStrategy:
+        """Compile the strategy and index the nodes of a request.
+
+        Args:
+            pricing_nodes: Pricing nodes as passed to ``calculate``
+            pricing_strategy: Strategy as passed to ``calculate``
+
+        Returns:
+            Compiled strategy
+        """
+        if isinstance(pricing_strategy, CompiledStrategy):
+            compiled = pricing_strategy
+        else:
+            # Matched by content on every call: even a read-only mapping may be
+            # a view of a dict the caller still edits
+            compiled = self._get_compiled(pricing_strategy)
+
+        self.precompute_indexes(pricing_nodes)
+        return compiled
+
+    def precompute_indexes(
+        self,
+        pricing_nodes: Union[
+            Sequence[Union[PricingNode, Node]], dict, PricingNodeColumns
+        ],
+    ) -> None:
+        """Index pricing nodes ahead of the first ``calculate`` call.
+
+        The indexes are kept for as long as the same immutable nodes object is
+        passed, so a catalog loaded once (e.g. at service startup) as a tuple
+        of ``Node`` records or an Arrow table is only indexed once. Other
+        catalogs, including tuples of node dicts, can be changed in place, so
+        they are indexed on every call.
+
+        Args:
+            pricing_nodes: Pricing nodes, in any form accepted by ``calculate``
+        """
+        if pricing_nodes is self._indexed_for and pricing_nodes is not None:
+            # OPTIMIZATION: Same catalog as the last call - reuse its indexes
+            self._indexes_reused = True
+            return
+
+        # Cleared first, so a failure below can't leave stale indexes in use
+        self._indexed_for = None
+        # Store pricing nodes as list for lookups
+        if isinstance(pricing_nodes, (list, tuple)):
+            self.pricing_nodes_list = pricing_nodes
+        elif hasattr(pricing_nodes, "column_names"):
+            # Arrow table (e.g. read from Parquet); pyarrow itself isn't needed
+            self.pricing_nodes_list = _nodes_from_columns(
+                _columns_from_table(pricing_nodes)
+            )
+        elif isinstance(pricing_nodes.get("path"), (list, tuple)):
+            # Column-oriented table; node paths never use "path" as a key
+            self.pricing_nodes_list = _nodes_from_columns(pricing_nodes)
+        else:
+            # If dict is provided, convert to list
+            self.pricing_nodes_list = list(pricing_nodes.values())
+
+        # OPTIMIZATION: Create indexes for faster lookups
+        self._index_nodes_by_path()
+        if _is_frozen_catalog(pricing_nodes):
+            self._indexed_for = pricing_nodes
+
+    def _check_inputs(
+        self,
+        compiled: CompiledStrategy,
+        inputs: Union[Sequence[Input], Mapping[str, Any]],
+    ) -> Tuple[Mapping[str, Any], dict[str, Union[int, float]], Optional[str]]:
+        """Run every check on user inputs that precedes step evaluation.
+
+        Args:
+            compiled: Compiled strategy of the request
+            inputs: User inputs as passed to ``calculate``
+
+        Returns:
+            Tuple of (input values by path, input costs by path, error message
+            or None)
+        """
+        # Create map of raw input values for reference in steps (e.g. price mode)
+        if isinstance(inputs, Mapping):
+            # OPTIMIZATION: Already keyed by path - no conversion needed
+            input_values = inputs
+            input_items = inputs.items()
+            has_duplicates = False
+        else:
+            input_items = [(inp["path"], inp.get("value")) for inp in inputs]
+            if compiled.has_price_mode or compiled.strategy.get("required_inputs"):
+                input_values = dict(input_items)
+                # OPTIMIZATION: The dict already collapsed any repeated path, so
+                # pricing only looks for duplicates when there is one to report
+                has_duplicates = len(input_values) != len(input_items)
+            else:
+                # OPTIMIZATION: Only price steps and required inputs read values
+                # by path; pricing still reports duplicates
+                input_values = {}
+                has_duplicates = True
+
+        # Validate required inputs
+        error = self._check_required_inputs(compiled, input_values)
+        if error is not None:
+            return input_values, {}, error
+
+        # Calculate final input costs
+        final_cost_by_path, error = self._calculate_input_costs(
+            input_items, has_duplicates
+        )
+        return input_values, final_cost_by_path, error
+
     def _index_nodes_by_path(self) -> None:
         """Create indexes for faster node lookups. O(n) preprocessing for O(1) lookups.
 
@@ -332,265 +1192,930 @@ class PricingEngine:
             - nodes_by_path: All nodes grouped by path (for error reporting)
             - label_nodes: (path, value) -> node mapping for label-type nodes
             - numeric_nodes: path -> node mapping for numeric-type nodes
+
+        Label nodes are kept by path and then value, for lookups without
+        building a (path, value) key; ``label_nodes`` is built from the nodes
+        on first access.
+
+        The path trie used for wildcard resolution is built on first use once
+        the indexes are reused, and the node paths matched by each selector are
+        kept for reuse.
         """
         # OPTIMIZATION: Build specialized indexes
+        # Set once these indexes serve another call, see precompute_indexes
+        self._indexes_reused = False
         self.nodes_by_path: dict[
             str, List[PricingNode]
         ] = {}  # path -> [nodes] for error reporting
-        self.label_nodes: dict[
-            tuple[str, Optional[Union[str, int, float]]], PricingNode
-        ] = {}  # (path, value) -> node for O(1) label lookup
+        self._label_nodes: Optional[
+            dict[tuple[str, Optional[Union[str, int, float]]], PricingNode]
+        ] = None  # (path, value) -> node, see label_nodes
         self.numeric_nodes: dict[
             str, PricingNode
         ] = {}  # path -> node for O(1) numeric lookup
-
+        self._labels_by_path: dict[
+            str, dict[Optional[Union[str, int, float]], PricingNode]
+        ] = {}  # path -> value -> node for label lookup without a key tuple
+        self._path_trie: Optional[PathTrie] = None
+        # selector pattern -> distinct node paths it matches
+        self._selector_paths: dict[str, Tuple[str, ...]] = {}
+
+        # OPTIMIZATION: Catalogs passed anew with each request are indexed on
+        # every call, so the loop works on local names
+        nodes_by_path = self.nodes_by_path
+        numeric_nodes = self.numeric_nodes
+        labels_by_path = self._labels_by_path
+        intern = sys.intern
         for node in self.pricing_nodes_list:
-            path = node["path"]
+            # Interned so lookups with compiled strategy paths match by identity
+            path = intern(node["path"])
             # Build path index
-            if path not in self.nodes_by_path:
-                self.nodes_by_path[path] = []
-            self.nodes_by_path[path].append(node)
+            path_nodes = nodes_by_path.get(path)
+            if path_nodes is None:
+                nodes_by_path[path] = [node]
+            else:
+                path_nodes.append(node)
 
             # Build specialized indexes
             if node["type"] == "numeric":
-                self.numeric_nodes[path] = node
+                numeric_nodes[path] = node
             else:  # label type
                 value = node.get("value")
-                self.label_nodes[(path, value)] = node
+                path_labels = labels_by_path.get(path)
+                if path_labels is None:
+                    labels_by_path[path] = {value: node}
+                else:
+                    path_labels[value] = node
 
-    def _validate_required_inputs(
-        self, pricing_strategy: PricingStrategy, inputs: List[Input]
-    ) -> None:
-        """Validate that all required inputs are present, supporting wildcard patterns.
+    @property
+    def label_nodes(
+        self,
+    ) -> dict[tuple[str, Optional[Union[str, int, float]]], PricingNode]:
+        """(path, value) -> node mapping for label-type nodes.
 
-        Args:
-            pricing_strategy: The pricing strategy containing required_inputs list
-            inputs: The list of user-provided inputs
+        The engine itself looks labels up by path and then value, so this
+        mapping is only built, once per catalog, when it is read.
+        """
+        if self._label_nodes is None:
+            self._label_nodes = {
+                (node["path"], node.get("value")): node
+                for node in self.pricing_nodes_list
+                if node["type"] != "numeric"
+            }
+        return self._label_nodes
 
-        Raises:
-            ValueError: If any required input pattern is not matched by provided inputs
+    def _get_path_trie(self) -> PathTrie:
+        """Get the segment trie over node paths, building it on first use.
+
+        Returns:
+            Trie of the current pricing nodes
         """
-        required_inputs = pricing_strategy.get("required_inputs", [])
-        if not required_inputs:
-            return
+        if self._path_trie is None:
+            self._path_trie = PathTrie()
+            for node in self.pricing_nodes_list:
+                self._path_trie.insert(node["path"].split("/"), node)
+        return self._path_trie
 
-        input_paths = {inp["path"] for inp in inputs}
+    def _check_required_inputs(
+        self, compiled: CompiledStrategy, input_paths: Mapping[str, Any]
+    ) -> Optional[str]:
+        """Check that all required inputs are present, supporting wildcard patterns.
 
-        for required_pattern in required_inputs:
-            # OPTIMIZATION: Use cached regex
-            regex = self._get_regex(required_pattern)
-            matched = any(regex.match(path) for path in input_paths)
+        Args:
+            compiled: The compiled strategy with its required_inputs list
+            input_paths: The user-provided input values keyed by path
+
+        Returns:
+            Error message for the first required input pattern not matched by
+            the provided inputs, or None if all are present
+        """
+        required_inputs = compiled.strategy.get("required_inputs", [])
+        if not required_inputs:
+            return None
+
+        # OPTIMIZATION: One combined match per input path marks the pattern it
+        # satisfies. A path satisfying several patterns only marks the first,
+        # so unmarked patterns are still checked on their own below.
+        satisfied = set()
+        # Whether every input path is a string, so a plain required path can be
+        # looked up; otherwise matching raises, as it always did
+        all_str = False
+        if compiled.required_regex is not None:
+            match = compiled.required_regex.match
+            try:
+                for path in input_paths:
+                    found = match(path)
+                    if found is not None:
+                        satisfied.add(found.lastgroup)
+                all_str = True
+            except TypeError:
+                # Non-string path; check pattern by pattern, as without the regex
+                satisfied.clear()
+        elif any(compiled.required_paths):
+            all_str = all(isinstance(path, str) for path in input_paths)
+
+        for index, required_pattern in enumerate(required_inputs):
+            if satisfied and compiled.required_groups[index] in satisfied:
+                continue
+            # OPTIMIZATION: A plain required path needs a lookup, not a regex scan.
+            # Paths ending in "\n" also match and are left to the regex below.
+            if all_str and compiled.required_paths[index] in input_paths:
+                continue
+            # OPTIMIZATION: Use precompiled selector or the process-wide cache
+            if isinstance(required_pattern, CompiledSelector):
+                match = required_pattern.match
+                required_pattern = required_pattern.pattern
+            else:
+                match = _compile_selector(required_pattern).match
+            matched = any(match(path) for path in input_paths)
 
             if not matched:
-                raise ValueError(
+                return (
                     f"Required input '{required_pattern}' is missing. "
                     f"Provided inputs: {sorted(input_paths)}"
                 )
+        return None
 
     def _calculate_input_costs(
-        self, inputs: List[Input]
-    ) -> dict[str, Union[int, float]]:
+        self, inputs: Iterable[Tuple[str, Any]], has_duplicates: bool = True
+    ) -> Tuple[dict[str, Union[int, float]], Optional[str]]:
         """Calculate the cost for each input based on pricing nodes.
 
         Args:
-            inputs: List of user inputs with paths and values
+            inputs: User inputs as (path, value) pairs
+            has_duplicates: Whether a path may appear more than once; pass
+                False when the paths are known to be unique to skip the check
 
         Returns:
-            Dictionary mapping paths to their calculated costs
-
-        Raises:
-            ValueError: If duplicate inputs found, node not found, or invalid values provided
+            Tuple of (dictionary mapping paths to their calculated costs, error
+            message or None). The error reports the first duplicate input, input
+            without a node, or invalid value; costs are incomplete in that case.
         """
         final_cost_by_path: dict[str, Union[int, float]] = {}
-
-        for inp in inputs:
-            path = inp["path"]
-            input_value = inp.get("value")
-            if path in final_cost_by_path:
-                raise ValueError(
-                    f"Duplicate input for path '{path}'. Each path must be unique."
+        labels_by_path = self._labels_by_path
+        numeric_nodes = self.numeric_nodes
+
+        for path, input_value in inputs:
+            if has_duplicates and path in final_cost_by_path:
+                return (
+                    final_cost_by_path,
+                    f"Duplicate input for path '{path}'. Each path must be unique.",
                 )
 
-            # OPTIMIZATION: O(1) lookup using path+value indexing
+            # OPTIMIZATION: O(1) lookup using path, then value indexing; no
+            # (path, value) key is built
             # Try label node first (path, value)
-            matching_node = self.label_nodes.get((path, input_value))
+            path_labels = labels_by_path.get(path)
+            value_type = type(input_value)
+            if path_labels is not None:
+                matching_node = path_labels.get(input_value)
+                if matching_node:
+                    final_cost_by_path[path] = matching_node["cost"]
+                    continue
+            elif value_type is not int and value_type is not float:
+                # Raises TypeError for unhashable values, as a key lookup did
+                hash(input_value)
+
+            # OPTIMIZATION: Nodes are indexed by type, so a node found by path
+            # alone is numeric and needs no type check
+            matching_node = numeric_nodes.get(path)
+            if matching_node:
+                # OPTIMIZATION: Exact int and float values, the common case, skip
+                # the isinstance() call
+                if (
+                    value_type is not int
+                    and value_type is not float
+                    and not isinstance(input_value, (int, float))
+                ):
+                    return (
+                        final_cost_by_path,
+                        f"Invalid numeric input '{input_value}' for path '{path}'.",
+                    )
+                final_cost_by_path[path] = input_value * matching_node["cost"]
+                continue
 
-            # If not found, try numeric node (path only)
-            if not matching_node:
-                matching_node = self.numeric_nodes.get(path)
+            # Node not found - provide helpful error
+            return final_cost_by_path, self._unmatched_input_error(path, input_value)
 
-            if not matching_node:
-                # Node not found - provide helpful error
-                if path not in self.nodes_by_path:
-                    raise ValueError(
-                        f"No pricing node found for path '{path}'. "
-                        f"Available paths: {sorted(self.nodes_by_path.keys())}"
-                    )
-                else:
-                    # Path exists but value doesn't match
-                    available_values = [
-                        n["value"]
-                        for n in self.nodes_by_path[path]
-                        if n["type"] == "label"
-                    ]
-                    raise ValueError(
-                        f"Invalid value '{input_value}' for path '{path}'. "
-                        f"Available values: {available_values}"
-                    )
+        return final_cost_by_path, None
 
-            # Calculate cost based on node type
-            if matching_node["type"] == "numeric":
-                if not isinstance(input_value, (int, float)):
-                    raise ValueError(
-                        f"Invalid numeric input '{input_value}' for path '{path}'."
-                    )
-                final_cost_by_path[path] = input_value * matching_node["cost"]
-            else:
-                final_cost_by_path[path] = matching_node["cost"]
+    def _unmatched_input_error(self, path: str, input_value: Any) -> str:
+        """Describe an input that matches no pricing node.
 
-        return final_cost_by_path
+        Kept out of ``_calculate_input_costs`` so the listing of available
+        paths or values is only built once an input has failed.
+
+        Args:
+            path: Input path
+            input_value: Input value
+
+        Returns:
+            Error message listing the available paths, or the available label
+            values if the path exists
+        """
+        if path not in self.nodes_by_path:
+            return (
+                f"No pricing node found for path '{path}'. "
+                f"Available paths: {sorted(self.nodes_by_path.keys())}"
+            )
+        # Path exists but value doesn't match
+        available_values = [
+            n["value"] for n in self.nodes_by_path[path] if n["type"] == "label"
+        ]
+        return (
+            f"Invalid value '{input_value}' for path '{path}'. "
+            f"Available values: {available_values}"
+        )
 
     def _resolve_value(
         self,
-        value: Union[str, int, float],
-        step_values: dict[int, Union[int, float]],
+        value: Union[Ref, str, int, float, CompiledSelector],
+        step_values: List[Union[int, float]],
         final_cost_by_path: dict[str, Union[int, float]],
     ) -> Union[int, float, List[Union[int, float]]]:
         """Resolve a value that can be a step reference, path, wildcard pattern, or literal.
 
         Args:
-            value: The value to resolve (can be "step__N", "/path", "/path/*/subpath", or literal number)
-            step_values: Dictionary of previously calculated step results
+            value: The value to resolve (can be a bound Ref, "step__N", "/path",
+                "/path/*/subpath", or literal number)
+            step_values: Results of previous steps by slot
             final_cost_by_path: Dictionary of calculated costs by path
 
         Returns:
             Resolved value (number or list of numbers for wildcards)
         """
-        if isinstance(value, str) and value.startswith("step__"):
-            step_id = int(value.split("__")[1])
-            return step_values.get(step_id, 0)
-        elif isinstance(value, str) and "*" in value:
-            # Wildcard pattern - return all matching values
-            return self._resolve_wildcard_pattern(value, final_cost_by_path)
-        elif isinstance(value, str):
-            return final_cost_by_path.get(value, 0)
-        else:
+        if type(value) is Ref:
+            kind = value.kind
+            if kind == _REF_STEP:
+                return step_values[value.key]
+            if kind == _REF_PATH:
+                return final_cost_by_path.get(value.key, 0)
+            if kind == _REF_CONST:
+                return value.key
+            if kind == _REF_WILDCARD:
+                return self._resolve_wildcard_pattern(value.key, final_cost_by_path)
+            value = value.key
+
+        # OPTIMIZATION: Numbers, the common raw operand, skip the checks below
+        value_type = type(value)
+        if value_type is int or value_type is float:
             return value
+        if isinstance(value, str):
+            if value.startswith("step__"):
+                # compile_strategy binds every well-formed reference, so this raises
+                int(value.split("__")[1])
+                return 0
+            if "*" in value:
+                return self._resolve_wildcard_pattern(value, final_cost_by_path)
+            return final_cost_by_path.get(value, 0)
+        if isinstance(value, CompiledSelector):
+            return self._resolve_wildcard_pattern(value, final_cost_by_path)
+        return value
 
-    def _get_regex(self, pattern: str) -> re.Pattern:
-        """Get or compile a regex pattern for wildcards. OPTIMIZATION: Caches compiled patterns.
+    def _resolve_wildcard_pattern(
+        self,
+        pattern: Union[str, CompiledSelector],
+        final_cost_by_path: dict[str, Union[int, float]],
+    ) -> Union[int, float, List[Union[int, float]]]:
+        """Resolve a wildcard pattern to all matching values from final_cost_by_path.
 
         Args:
-            pattern: Wildcard pattern (e.g., "/material/*/color")
+            pattern: Wildcard pattern to match (e.g., "/material/*/color"),
+                either as a string or precompiled selector
+            final_cost_by_path: Dictionary of costs by path
 
         Returns:
-            Compiled regex pattern
+            Single value if one match, list of values if multiple matches
+
+        Raises:
+            ValueError: If no paths match the pattern
         """
-        if pattern not in self._regex_cache:
-            regex_str = "^" + pattern.replace("*", "[^/]+") + "$"
-            self._regex_cache[pattern] = re.compile(regex_str)
-        return self._regex_cache[pattern]
+        matching_values = self._wildcard_values(pattern, final_cost_by_path)
+        # Return list of values if multiple, single value if one
+        return matching_values if len(matching_values) > 1 else matching_values[0]
 
-    def _resolve_wildcard_pattern(
-        self, pattern: str, final_cost_by_path: dict[str, Union[int, float]]
-    ) -> Union[int, float, List[Union[int, float]]]:
-        """Resolve a wildcard pattern to all matching values from final_cost_by_path.
+    def _wildcard_values(
+        self,
+        pattern: Union[str, CompiledSelector],
+        final_cost_by_path: dict[str, Union[int, float]],
+    ) -> List[Union[int, float]]:
+        """Collect the costs of all inputs matching a wildcard pattern.
 
         Args:
-            pattern: Wildcard pattern to match (e.g., "/material/*/color")
+            pattern: Wildcard pattern to match, as a string or compiled selector
             final_cost_by_path: Dictionary of costs by path
 
         Returns:
-            Single value if one match, list of values if multiple matches
+            Matching costs in input order, as a list even for a single match
 
         Raises:
             ValueError: If no paths match the pattern
         """
-        # OPTIMIZATION: Use cached regex
-        regex = self._get_regex(pattern)
+        if not isinstance(pattern, CompiledSelector):
+            pattern = _compile_selector(pattern)
+
+        node_paths = None
+        if pattern.segments is not None:
+            # OPTIMIZATION: Walk the node trie instead of scanning every input,
+            # once per selector for the current nodes. Building the trie visits
+            # every node, so it waits until the same catalog is used again.
+            node_paths = self._selector_paths.get(pattern.pattern)
+            if node_paths is None and self._indexes_reused:
+                node_paths = self._selector_paths[pattern.pattern] = tuple(
+                    dict.fromkeys(
+                        node["path"]
+                        for node in self._get_path_trie().glob(pattern.segments)
+                    )
+                )
 
-        # Find all matching paths
-        matching_values = [
-            cost for path, cost in final_cost_by_path.items() if regex.match(path)
-        ]
+        if node_paths is None or len(node_paths) > len(final_cost_by_path):
+            # Find all matching paths; cheaper when there are fewer inputs
+            # than catalog paths matching the selector
+            matching_values = [
+                cost for path, cost in final_cost_by_path.items() if pattern.match(path)
+            ]
+        else:
+            # Every costed input has a node, so its path is among the matches
+            matching_paths = [path for path in node_paths if path in final_cost_by_path]
+            # Keep values in input order, as a scan of the inputs would
+            if len(matching_paths) > 1:
+                if self._input_positions is None:
+                    self._input_positions = {
+                        path: position
+                        for position, path in enumerate(final_cost_by_path)
+                    }
+                matching_paths.sort(key=self._input_positions.__getitem__)
+            matching_values = [final_cost_by_path[path] for path in matching_paths]
 
         if not matching_values:
             raise ValueError(
-                f"No inputs found matching wildcard pattern '{pattern}'. "
+                f"No inputs found matching wildcard pattern '{pattern.pattern}'. "
                 f"Available paths: {sorted(final_cost_by_path.keys())}"
             )
+        return matching_values
 
-        # Return list of values if multiple, single value if one
-        return matching_values if len(matching_values) > 1 else matching_values[0]
+    def _step_references(self, step: Step) -> Tuple[List[int], List[Any]]:
+        """Collect the step ids and input paths a step reads.
 
-    def _process_step(
+        Args:
+            step: The step configuration
+
+        Returns:
+            Tuple of (referenced step ids, referenced paths), where wildcard
+            paths are returned as compiled selectors
+
+        Raises:
+            ValueError: If a step reference is malformed
+        """
+        operands = list(step.get("inputs", []))
+        operands.extend(
+            step[k] for k in ("value", "min", "max", "then", "else") if k in step
+        )
+        condition = step.get("condition", {})
+        operands.extend(condition[k] for k in ("left", "right") if k in condition)
+
+        step_refs: List[int] = []
+        path_refs: List[Any] = []
+        for operand in operands:
+            if isinstance(operand, str) and operand.startswith("step__"):
+                step_refs.append(int(operand.split("__")[1]))
+            elif isinstance(operand, str) and "*" in operand:
+                path_refs.append(_compile_selector(operand))
+            elif isinstance(operand, (str, CompiledSelector)):
+                path_refs.append(operand)
+        return step_refs, path_refs
+
+    def _step_cache_key(self, step: Step) -> Optional[tuple]:
+        """Collect, once per compiled step, what its memoized results depend on.
+
+        Args:
+            step: The step configuration
+
+        Returns:
+            Tuple of (step text, referenced step ids, referenced paths, price
+            target paths), or None for a malformed step, which is never cached
+        """
+        try:
+            step_refs, path_refs = self._step_references(step)
+            price_targets = (
+                [t for t in step.get("inputs", [])[:1] if isinstance(t, str)]
+                if step["mode"] == "price"
+                else []
+            )
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+        return repr(step), tuple(step_refs), tuple(path_refs), tuple(price_targets)
+
+    def _process_step_cached(
         self,
-        step: Step,
-        step_values: dict[int, Union[int, float]],
+        step_key: Optional[tuple],
+        op: StepOp,
+        slots: dict[Any, int],
+        step_values: List[Union[int, float]],
         final_cost_by_path: dict[str, Union[int, float]],
         input_values: dict[str, Any],
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
-        """Process a single pricing strategy step and return result and breakdown entry.
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
+        """Process a step, reusing the result of an earlier call when possible.
+
+        The fingerprint covers the step body and every value the step reads:
+        referenced step results, costs of referenced paths and, for price
+        steps, the raw input value and pricing nodes of the target path.
 
         Args:
-            step: The step configuration
-            step_values: Dictionary of previously calculated step results
+            step_key: What the step's results depend on, from _step_cache_key
+            op: The compiled operation for the step
+            slots: Result slot by step id
+            step_values: Results of previous steps by slot
             final_cost_by_path: Dictionary of calculated costs by path
+            input_values: Dictionary of raw input values by path
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (result_value, breakdown_entry)
-
-        Raises:
-            ValueError: If unknown mode or invalid step configuration
         """
-        mode = step["mode"]
-        step_name = step.get("name", f"Step {step['id']}")
+        if step_key is None:
+            # Malformed step - let the operation report the error
+            return op(
+                self, step_values, final_cost_by_path, input_values, emit_breakdown
+            )
+        # OPTIMIZATION: References and step text are collected at compile time
+        step_text, step_refs, path_refs, price_targets = step_key
+
+        read_values: List[Any] = [
+            0 if ref not in slots else step_values[slots[ref]] for ref in step_refs
+        ]
+        for ref in path_refs:
+            if isinstance(ref, CompiledSelector):
+                read_values.append(
+                    [(p, c) for p, c in final_cost_by_path.items() if ref.match(p)]
+                )
+            else:
+                read_values.append(final_cost_by_path.get(ref, 0))
+        for target in price_targets:
+            read_values.append(
+                (
+                    target in input_values,
+                    input_values.get(target),
+                    self.nodes_by_path.get(target),
+                )
+            )
+
+        # repr keeps 1, 1.0 and True apart so cached results keep their types
+        fingerprint = (
+            self.calc_rounding_decimals,
+            emit_breakdown,
+            step_text,
+            repr(read_values),
+        )
+        cached = self._step_cache.get(fingerprint)
+        if cached is None:
+            result, breakdown_entry = op(
+                self, step_values, final_cost_by_path, input_values, emit_breakdown
+            )
+            self._step_cache[fingerprint] = (result, breakdown_entry, tuple(path_refs))
+            if len(self._step_cache) > self._STEP_CACHE_SIZE:
+                self._step_cache.popitem(last=False)
+        else:
+            self._step_cache.move_to_end(fingerprint)
+            result, breakdown_entry, _ = cached
+        if breakdown_entry is None:
+            return result, None
+        # Hand out copies so callers can't alter the cached entry
+        return result, {**breakdown_entry, "inputs": list(breakdown_entry["inputs"])}
+
+    def _resolve_inputs(
+        self,
+        inputs: List[Ref],
+        step_values: List[Union[int, float]],
+        final_cost_by_path: dict[str, Union[int, float]],
+    ) -> List[Union[int, float]]:
+        """Resolve a step's inputs, flattening wildcard matches into the list.
 
-        # Resolve inputs for modes that use them
+        Args:
+            inputs: The step's input references
+            step_values: Results of previous steps by slot
+            final_cost_by_path: Dictionary of calculated costs by path
+
+        Returns:
+            List of resolved numeric values
+        """
         resolved_inputs: List[Union[int, float]] = []
-        for item in step.get("inputs", []):
-            resolved = self._resolve_value(item, step_values, final_cost_by_path)
-            # If resolved value is a list (from wildcard), extend instead of append
+        for ref in inputs:
+            # OPTIMIZATION: Read the common kinds inline, without a method call.
+            # Costs and bound constants are never lists, and wildcard matches
+            # always are, so only step results and raw operands are checked.
+            kind = ref.kind
+            if kind == _REF_PATH:
+                resolved_inputs.append(final_cost_by_path.get(ref.key, 0))
+                continue
+            if kind == _REF_CONST:
+                resolved_inputs.append(ref.key)
+                continue
+            if kind == _REF_WILDCARD:
+                resolved_inputs.extend(
+                    self._wildcard_values(ref.key, final_cost_by_path)
+                )
+                continue
+            if kind == _REF_STEP:
+                resolved = step_values[ref.key]
+            else:
+                resolved = self._resolve_value(ref, step_values, final_cost_by_path)
+            # A step can yield a list, e.g. an if step whose branch is a wildcard
             if isinstance(resolved, list):
                 resolved_inputs.extend(resolved)
             else:
                 resolved_inputs.append(resolved)
+        return resolved_inputs
+
+    def _compile_step(
+        self,
+        step: Step,
+        slots: dict[Any, int],
+        slot: Optional[int],
+        constants: dict[int, Union[int, float]],
+    ) -> StepOp:
+        """Lower a step to an operation with its mode dispatch already resolved.
+
+        Malformed steps compile to an operation that raises when executed, so
+        errors surface in step order exactly as during interpretation.
+
+        Args:
+            step: The step configuration
+            slots: Result slot by step id; ids referenced by this step are added
+            slot: Result slot of this step, None if its id is unhashable
+            constants: Folded result by slot, for the steps compiled so far;
+                updated with this step's result when it is folded
+
+        Returns:
+            Operation taking (engine, step_values, final_cost_by_path, input_values,
+            emit_breakdown) and returning (result_value, breakdown_entry)
+        """
+        if not isinstance(step, Mapping) or "mode" not in step or "id" not in step:
+
+            def malformed(engine, *_):
+                # Raises the KeyError or TypeError of reading the step
+                step["mode"], step["id"]
+
+            return malformed
+
+        def bind(operand: Any) -> Ref:
+            if isinstance(operand, str):
+                if operand.startswith("step__"):
+                    try:
+                        step_id = int(operand.split("__")[1])
+                    except ValueError:
+                        # Raises when resolved, as before compiling
+                        return Ref(_REF_RAW, operand)
+                    ref_slot = slots.setdefault(step_id, len(slots))
+                    if ref_slot in constants:
+                        # OPTIMIZATION: Folded results are bound as constants
+                        return Ref(_REF_CONST, constants[ref_slot])
+                    return Ref(_REF_STEP, ref_slot)
+                if "*" in operand:
+                    # OPTIMIZATION: Resolve the selector once, not on every read
+                    try:
+                        return Ref(_REF_WILDCARD, _compile_selector(operand))
+                    except re.error:
+                        # Kept as text, so an invalid pattern fails in order
+                        return Ref(_REF_WILDCARD, operand)
+                if type(operand) is not str:
+                    return Ref(_REF_PATH, operand)  # Subclasses can't be interned
+                # Intern literal paths once so lookups compare by identity
+                return Ref(_REF_PATH, sys.intern(operand))
+            if isinstance(operand, CompiledSelector):
+                return Ref(_REF_WILDCARD, operand)
+            if isinstance(operand, list):
+                # List constants are flattened into the inputs when resolved
+                return Ref(_REF_RAW, operand)
+            return Ref(_REF_CONST, operand)
+
+        mode = step["mode"]
+        step_name = step.get("name", f"Step {step['id']}")
+        inputs = [bind(item) for item in step.get("inputs", [])]
+        # OPTIMIZATION: Steps that ignore their inputs still resolve them for the
+        # errors they raise, but step, path and constant reads can't fail
+        checked_inputs = [
+            ref for ref in inputs if ref.kind == _REF_WILDCARD or ref.kind == _REF_RAW
+        ]
+
+        # Operands of a step that can be folded, when all are numeric constants
+        fold_refs: Optional[List[Ref]] = None
+
+        if isinstance(mode, str) and mode in self._INPUT_MODES:
+            process = getattr(type(self), f"_process_{mode}")
+            fold_refs = inputs
+            decimals = step.get("decimals") if mode == "round" else None
+
+            if type(decimals) is int:
+                # OPTIMIZATION: Constant decimal places are converted only once
+
+                def op(engine, step_values, final_cost_by_path, input_values, emit):
+                    resolved_inputs = engine._resolve_inputs(
+                        inputs, step_values, final_cost_by_path
+                    )
+                    return engine._process_round(
+                        step, step_name, resolved_inputs, emit, decimals
+                    )
+
+            else:
+
+                def op(engine, step_values, final_cost_by_path, input_values, emit):
+                    resolved_inputs = engine._resolve_inputs(
+                        inputs, step_values, final_cost_by_path
+                    )
+                    return process(engine, step, step_name, resolved_inputs, emit)
 
-        # Process based on mode
-        if mode == "add":
-            return self._process_add(step, step_name, resolved_inputs)
-        elif mode == "subtract":
-            return self._process_subtract(step, step_name, resolved_inputs)
-        elif mode == "multiply":
-            return self._process_multiply(step, step_name, resolved_inputs)
-        elif mode == "divide":
-            return self._process_divide(step, step_name, resolved_inputs)
-        elif mode == "min":
-            return self._process_min(step, step_name, resolved_inputs)
-        elif mode == "max":
-            return self._process_max(step, step_name, resolved_inputs)
-        elif mode == "percentage":
-            return self._process_percentage(step, step_name, resolved_inputs)
-        elif mode == "round":
-            return self._process_round(step, step_name, resolved_inputs)
         elif mode == "clamp":
-            return self._process_clamp(step, step_name, step_values, final_cost_by_path)
+            # OPTIMIZATION: Operands are read from slots, not looked up per call
+            min_ref = bind(step.get("min", 0))
+            max_ref = bind(step.get("max", 0))
+            # OPTIMIZATION: Ordered constant bounds can't fail, so skip the check
+            check_range = not (
+                min_ref.kind == _REF_CONST
+                and max_ref.kind == _REF_CONST
+                and type(min_ref.key) in (int, float)
+                and type(max_ref.key) in (int, float)
+                and min_ref.key <= max_ref.key
+            )
+            clamp_step = _BoundClamp(
+                step["id"],
+                bind(step.get("value", 0)),
+                min_ref,
+                max_ref,
+                check_range,
+            )
+            if not checked_inputs:
+                fold_refs = [clamp_step.value, min_ref, max_ref]
+
+            def op(engine, step_values, final_cost_by_path, input_values, emit):
+                # Inputs are unused but resolved as for any step
+                if checked_inputs:
+                    engine._resolve_inputs(
+                        checked_inputs, step_values, final_cost_by_path
+                    )
+                return engine._process_clamp(
+                    clamp_step, step_name, step_values, final_cost_by_path, emit
+                )
+
         elif mode == "if":
-            return self._process_if(step, step_name, step_values, final_cost_by_path)
+            condition = step.get("condition", {})
+            then_ref = bind(step.get("then", 0))
+            else_ref = bind(step.get("else", 0))
+            if_step = None
+            if isinstance(condition, Mapping):
+                operator = condition.get("operator", "==")
+                try:
+                    # OPTIMIZATION: Look the operator up once, not per calculation
+                    compare = self.OPERATORS.get(operator)
+                except TypeError:
+                    compare = None  # Unhashable operators fail at evaluation
+                if_step = _BoundIf(
+                    step["id"],
+                    bind(condition.get("left")),
+                    bind(condition.get("right")),
+                    operator,
+                    compare,
+                    then_ref,
+                    else_ref,
+                )
+                if compare is not None and not checked_inputs:
+                    fold_refs = [if_step.left, if_step.right, then_ref, else_ref]
+
+            def read(operand: Any) -> Ref:
+                # Binds a condition operand read at evaluation; slots are
+                # complete by then, so references to other ids read as 0
+                if isinstance(operand, str) and operand.startswith("step__"):
+                    try:
+                        step_id = int(operand.split("__")[1])
+                    except ValueError:
+                        return Ref(_REF_RAW, operand)
+                    if step_id not in slots:
+                        return Ref(_REF_CONST, 0)
+                    return Ref(_REF_STEP, slots[step_id])
+                return Ref(_REF_RAW, operand)
+
+            def op(engine, step_values, final_cost_by_path, input_values, emit):
+                # Inputs are unused but resolved as for any step
+                if checked_inputs:
+                    engine._resolve_inputs(
+                        checked_inputs, step_values, final_cost_by_path
+                    )
+                bound = if_step
+                if bound is None:
+                    # Not a mapping: read as-is, raising as evaluating it did
+                    bound = _BoundIf(
+                        step["id"],
+                        read(condition.get("left")),
+                        read(condition.get("right")),
+                        condition.get("operator", "=="),
+                        None,
+                        then_ref,
+                        else_ref,
+                    )
+                return engine._process_if(
+                    bound, step_name, step_values, final_cost_by_path, emit
+                )
+
         elif mode == "price":
-            return self._process_price(step, step_name, input_values)
+            # OPTIMIZATION: The target path is validated once; its errors are
+            # still raised when the step runs
+            inputs_list = step.get("inputs", [])
+            target_path = inputs_list[0] if inputs_list else None
+            if not inputs_list:
+                price_error = f"{step_name}: price mode requires one input path"
+            elif not isinstance(target_path, str):
+                price_error = f"{step_name}: price mode input must be a path string"
+            else:
+                price_error = None
+
+            def op(engine, step_values, final_cost_by_path, input_values, emit):
+                if checked_inputs:
+                    engine._resolve_inputs(
+                        checked_inputs, step_values, final_cost_by_path
+                    )
+                if price_error is not None:
+                    raise ValueError(price_error)
+                return engine._process_price(
+                    step, step_name, target_path, input_values, emit
+                )
+
         else:
-            raise ValueError(f"Unknown mode: {mode}")
+
+            def op(engine, step_values, final_cost_by_path, input_values, emit):
+                engine._resolve_inputs(checked_inputs, step_values, final_cost_by_path)
+                raise ValueError(f"Unknown mode: {mode}")
+
+        if slot is None:
+            run = op
+
+            def op(engine, *args):
+                result = run(engine, *args)
+                # Raises TypeError for the unhashable id, as storing the result did
+                hash(step["id"])
+                return result
+
+        else:
+            constants.pop(slot, None)
+            if fold_refs is not None and all(
+                ref.kind == _REF_CONST and type(ref.key) in (int, float)
+                for ref in fold_refs
+            ):
+                op = self._fold_step(op, slot, constants)
+        return op
+
+    def _fold_step(
+        self, op: StepOp, slot: int, constants: dict[int, Union[int, float]]
+    ) -> StepOp:
+        """Evaluate a step whose operands are all numeric constants once.
+
+        The result is recorded in ``constants``, so later references to the
+        step are bound as constants too. The breakdown entry is built on first
+        use for each rounding setting and copied for every calculation.
+
+        Args:
+            op: The compiled operation for the step
+            slot: Result slot of the step
+            constants: Folded result by slot
+
+        Returns:
+            Operation returning the folded result, or ``op`` itself if the step
+            raises, so the error is still raised in step order
+        """
+        try:
+            result = op(self, [], {}, {}, False)[0]
+        except (ArithmeticError, TypeError, ValueError):
+            return op
+        constants[slot] = result
+        # Rounding setting -> breakdown entry
+        entries: dict[Any, BreakdownEntry] = {}
+
+        def folded(engine, step_values, final_cost_by_path, input_values, emit):
+            if not emit:
+                return result, None
+            decimals = engine.calc_rounding_decimals
+            entry = entries.get(decimals)
+            if entry is None:
+                entry = entries[decimals] = op(
+                    engine, step_values, final_cost_by_path, input_values, True
+                )[1]
+            # Copied, so callers may modify the entries they are returned
+            entry = entry.copy()
+            entry["inputs"] = entry["inputs"].copy()
+            return result, entry
+
+        return folded
+
+    def compile_strategy(self, pricing_strategy: PricingStrategy) -> CompiledStrategy:
+        """Compile a strategy once for repeated ``calculate`` calls.
+
+        Each step is lowered to a pre-bound operation, so calculations skip the
+        per-step mode dispatch, and ``step__N`` references are bound to result
+        slots, so they are read without parsing or hashing. Steps whose
+        operands are all numeric constants, directly or through other such
+        steps, are evaluated once here. If steps use this engine's
+        ``OPERATORS`` as they are at this point. Hold on to the result and pass
+        it to ``calculate`` in place of the strategy.
+
+        Args:
+            pricing_strategy: Strategy configuration, optionally preprocessed by
+                ``compile_selectors``
+
+        Returns:
+            Compiled strategy, valid as long as the strategy is not modified
+        """
+        # A missing "steps" key is reported by calculate, after input validation
+        steps = pricing_strategy.get("steps", ())
+
+        # Duplicate ids share a slot, so a reference reads the latest result
+        slots: dict[Any, int] = {}
+        targets: List[Optional[int]] = []
+        visible: List[bool] = []
+        for step in steps:
+            slot = None
+            if isinstance(step, Mapping):
+                if "id" in step:
+                    try:
+                        slot = slots.setdefault(step["id"], len(slots))
+                    except TypeError:
+                        pass  # Unhashable id; its operation raises instead
+                visible.append(not step.get("is_hidden", False))
+            else:
+                visible.append(True)  # Malformed; its operation raises
+            targets.append(slot)
+
+        # OPTIMIZATION: Steps on numeric constants only are folded; their
+        # results are computed here once, in step order
+        constants: dict[int, Union[int, float]] = {}
+        ops = tuple(
+            self._compile_step(step, slots, slot, constants)
+            for step, slot in zip(steps, targets)
+        )
+        has_price_mode = any(
+            isinstance(step, Mapping) and step.get("mode") == "price" for step in steps
+        )
+        return CompiledStrategy(
+            pricing_strategy,
+            ops,
+            slots,
+            tuple(targets),
+            tuple(visible),
+            visible.count(True),
+            has_price_mode,
+            tuple(self._step_cache_key(step) for step in steps),
+            *_compile_required(pricing_strategy.get("required_inputs")),
+        )
+
+    def _get_compiled(self, pricing_strategy: PricingStrategy) -> CompiledStrategy:
+        """Get the compiled form of a strategy, reusing it for equal content.
+
+        Strategies re-sent with each request (e.g. parsed from JSON) are new
+        objects every time, so they are matched by content. A private copy is
+        compiled, keeping cached entries valid if the caller later modifies
+        its strategy.
+
+        Args:
+            pricing_strategy: Strategy configuration
+
+        Returns:
+            Compiled strategy
+        """
+        try:
+            # OPTIMIZATION: marshal serializes plain parsed JSON several times
+            # faster than repr, and like repr keeps 1, 1.0 and True apart
+            key: Union[bytes, str] = marshal.dumps(pricing_strategy)
+        except ValueError:
+            # Read-only mappings, subclasses and selectors can't be marshalled
+            key = repr(pricing_strategy)
+        if self.OPERATORS is not self._compiled_operators:
+            # Conditions bind their comparison when compiled
+            self._compiled_cache.clear()
+            self._compiled_operators = self.OPERATORS
+        compiled = self._compiled_cache.get(key)
+        if compiled is not None:
+            self._compiled_cache.move_to_end(key)
+            return compiled
+
+        compiled = self.compile_strategy(_copy_config(pricing_strategy))
+        self._compiled_cache[key] = compiled
+        if len(self._compiled_cache) > self._COMPILED_CACHE_SIZE:
+            self._compiled_cache.popitem(last=False)
+        return compiled
 
     def _process_add(
-        self, step: Step, step_name: str, resolved_inputs: List[Union[int, float]]
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        self,
+        step: Step,
+        step_name: str,
+        resolved_inputs: List[Union[int, float]],
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process addition operation.
 
         Args:
             step: The step configuration
             step_name: Human-readable name for the step
             resolved_inputs: List of resolved numeric values to add
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (sum_result, breakdown_entry)
@@ -600,27 +2125,38 @@ class PricingEngine:
         """
         if not resolved_inputs:
             raise ValueError(f"{step_name}: add requires at least one input")
-        result = sum(resolved_inputs)
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Addition",
-            "description": f"Sum of {len(resolved_inputs)} values",
-            "inputs": resolved_inputs,
-            "calculation": " + ".join(self._format_number(v) for v in resolved_inputs),
-            "result": result,
-        }
+        if len(resolved_inputs) == 2:
+            # OPTIMIZATION: Two operands, the common case, skip the sum() call.
+            # Starting from 0 as sum() does keeps results identical.
+            first, second = resolved_inputs
+            result = 0 + first + second
+        else:
+            result = sum(resolved_inputs)
+        if not emit_breakdown:
+            return result, None
+        breakdown = _ADDITION_BREAKDOWN.copy()
+        breakdown["step_id"] = step["id"]
+        breakdown["name"] = step_name
+        breakdown["description"] = f"Sum of {len(resolved_inputs)} values"
+        breakdown["inputs"] = resolved_inputs
+        breakdown["calculation"] = " + ".join(map(self._format_number, resolved_inputs))
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_subtract(
-        self, step: Step, step_name: str, resolved_inputs: List[Union[int, float]]
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        self,
+        step: Step,
+        step_name: str,
+        resolved_inputs: List[Union[int, float]],
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process subtraction operation.
 
         Args:
             step: The step configuration
             step_name: Human-readable name for the step
             resolved_inputs: List of values, first value minus all remaining values
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (result, breakdown_entry)
@@ -630,29 +2166,40 @@ class PricingEngine:
         """
         if not resolved_inputs:
             raise ValueError(f"{step_name}: subtract requires at least one input")
-        result = resolved_inputs[0]
-        for val in resolved_inputs[1:]:
-            result -= val
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Subtraction",
-            "description": f"Subtract {len(resolved_inputs) - 1} value(s) from base",
-            "inputs": resolved_inputs,
-            "calculation": " - ".join(self._format_number(v) for v in resolved_inputs),
-            "result": result,
-        }
+        if len(resolved_inputs) == 2:
+            # OPTIMIZATION: Two operands, the common case, are combined inline
+            first, second = resolved_inputs
+            result = first - second
+        else:
+            # OPTIMIZATION: Reduce in C rather than in a Python loop
+            result = reduce(sub, resolved_inputs)
+        if not emit_breakdown:
+            return result, None
+        breakdown = _SUBTRACTION_BREAKDOWN.copy()
+        breakdown["step_id"] = step["id"]
+        breakdown["name"] = step_name
+        breakdown["description"] = (
+            f"Subtract {len(resolved_inputs) - 1} value(s) from base"
+        )
+        breakdown["inputs"] = resolved_inputs
+        breakdown["calculation"] = " - ".join(map(self._format_number, resolved_inputs))
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_multiply(
-        self, step: Step, step_name: str, resolved_inputs: List[Union[int, float]]
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        self,
+        step: Step,
+        step_name: str,
+        resolved_inputs: List[Union[int, float]],
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process multiplication operation.
 
         Args:
             step: The step configuration
             step_name: Human-readable name for the step
             resolved_inputs: List of values to multiply together
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (product_result, breakdown_entry)
@@ -662,29 +2209,37 @@ class PricingEngine:
         """
         if not resolved_inputs:
             raise ValueError(f"{step_name}: multiply requires at least one input")
-        result = 1
-        for val in resolved_inputs:
-            result *= val
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Multiplication",
-            "description": f"Product of {len(resolved_inputs)} values",
-            "inputs": resolved_inputs,
-            "calculation": " × ".join(self._format_number(v) for v in resolved_inputs),
-            "result": result,
-        }
+        if len(resolved_inputs) == 2:
+            # OPTIMIZATION: Two operands, the common case, are combined inline
+            first, second = resolved_inputs
+            result = 1 * first * second
+        else:
+            result = reduce(mul, resolved_inputs, 1)
+        if not emit_breakdown:
+            return result, None
+        breakdown = _MULTIPLICATION_BREAKDOWN.copy()
+        breakdown["step_id"] = step["id"]
+        breakdown["name"] = step_name
+        breakdown["description"] = f"Product of {len(resolved_inputs)} values"
+        breakdown["inputs"] = resolved_inputs
+        breakdown["calculation"] = " × ".join(map(self._format_number, resolved_inputs))
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_divide(
-        self, step: Step, step_name: str, resolved_inputs: List[Union[int, float]]
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        self,
+        step: Step,
+        step_name: str,
+        resolved_inputs: List[Union[int, float]],
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process division operation.
 
         Args:
             step: The step configuration
             step_name: Human-readable name for the step
             resolved_inputs: List of values, first divided by all remaining values
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (result, breakdown_entry)
@@ -694,31 +2249,50 @@ class PricingEngine:
         """
         if len(resolved_inputs) < 2:
             raise ValueError(f"{step_name}: divide requires at least two inputs")
-        result = resolved_inputs[0]
-        for val in resolved_inputs[1:]:
-            if val == 0:
+        if len(resolved_inputs) == 2:
+            # OPTIMIZATION: Two operands, the common case, are combined inline
+            first, second = resolved_inputs
+            if second == 0:
                 raise ValueError(f"{step_name}: division by zero")
-            result /= val
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Division",
-            "description": f"Divide {resolved_inputs[0]} by {len(resolved_inputs) - 1} value(s)",
-            "inputs": resolved_inputs,
-            "calculation": " ÷ ".join(self._format_number(v) for v in resolved_inputs),
-            "result": result,
-        }
+            result = first / second
+        else:
+            divisors = resolved_inputs[1:]
+            if 0 not in divisors:
+                result = reduce(truediv, divisors, resolved_inputs[0])
+            else:
+                # Divide up to the zero, so earlier operand errors surface first
+                result = resolved_inputs[0]
+                for val in divisors:
+                    if val == 0:
+                        raise ValueError(f"{step_name}: division by zero")
+                    result /= val
+        if not emit_breakdown:
+            return result, None
+        breakdown = _DIVISION_BREAKDOWN.copy()
+        breakdown["step_id"] = step["id"]
+        breakdown["name"] = step_name
+        breakdown["description"] = (
+            f"Divide {resolved_inputs[0]} by {len(resolved_inputs) - 1} value(s)"
+        )
+        breakdown["inputs"] = resolved_inputs
+        breakdown["calculation"] = " ÷ ".join(map(self._format_number, resolved_inputs))
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_min(
-        self, step: Step, step_name: str, resolved_inputs: List[Union[int, float]]
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        self,
+        step: Step,
+        step_name: str,
+        resolved_inputs: List[Union[int, float]],
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process minimum operation.
 
         Args:
             step: The step configuration
             step_name: Human-readable name for the step
             resolved_inputs: List of values to find minimum from
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (minimum_value, breakdown_entry)
@@ -729,26 +2303,33 @@ class PricingEngine:
         if not resolved_inputs:
             raise ValueError(f"{step_name}: min requires at least one input")
         result = min(resolved_inputs)
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Minimum",
-            "description": f"Minimum of {len(resolved_inputs)} values",
-            "inputs": resolved_inputs,
-            "calculation": f"min({', '.join(self._format_number(v) for v in resolved_inputs)})",
-            "result": result,
-        }
+        if not emit_breakdown:
+            return result, None
+        breakdown = _MINIMUM_BREAKDOWN.copy()
+        breakdown["step_id"] = step["id"]
+        breakdown["name"] = step_name
+        breakdown["description"] = f"Minimum of {len(resolved_inputs)} values"
+        breakdown["inputs"] = resolved_inputs
+        breakdown["calculation"] = (
+            f"min({', '.join(map(self._format_number, resolved_inputs))})"
+        )
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_max(
-        self, step: Step, step_name: str, resolved_inputs: List[Union[int, float]]
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        self,
+        step: Step,
+        step_name: str,
+        resolved_inputs: List[Union[int, float]],
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process maximum operation.
 
         Args:
             step: The step configuration
             step_name: Human-readable name for the step
             resolved_inputs: List of values to find maximum from
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (maximum_value, breakdown_entry)
@@ -759,26 +2340,33 @@ class PricingEngine:
         if not resolved_inputs:
             raise ValueError(f"{step_name}: max requires at least one input")
         result = max(resolved_inputs)
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Maximum",
-            "description": f"Maximum of {len(resolved_inputs)} values",
-            "inputs": resolved_inputs,
-            "calculation": f"max({', '.join(self._format_number(v) for v in resolved_inputs)})",
-            "result": result,
-        }
+        if not emit_breakdown:
+            return result, None
+        breakdown = _MAXIMUM_BREAKDOWN.copy()
+        breakdown["step_id"] = step["id"]
+        breakdown["name"] = step_name
+        breakdown["description"] = f"Maximum of {len(resolved_inputs)} values"
+        breakdown["inputs"] = resolved_inputs
+        breakdown["calculation"] = (
+            f"max({', '.join(map(self._format_number, resolved_inputs))})"
+        )
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_percentage(
-        self, step: Step, step_name: str, resolved_inputs: List[Union[int, float]]
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        self,
+        step: Step,
+        step_name: str,
+        resolved_inputs: List[Union[int, float]],
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process percentage calculation.
 
         Args:
             step: The step configuration (may include 'percent' field)
             step_name: Human-readable name for the step
             resolved_inputs: One value (base) or two values (base, percentage)
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (percentage_result, breakdown_entry)
@@ -799,7 +2387,12 @@ class PricingEngine:
             raise ValueError(f"{step_name}: percentage allows only one or two inputs")
 
         # Validate percentage value
-        if not isinstance(calc_percent, (int, float)):
+        percent_type = type(calc_percent)
+        if (
+            percent_type is not int
+            and percent_type is not float
+            and not isinstance(calc_percent, (int, float))
+        ):
             raise ValueError(f"{step_name}: percentage must be a numeric value")
         if calc_percent < 0:
             raise ValueError(
@@ -807,26 +2400,35 @@ class PricingEngine:
             )
 
         result = (resolved_inputs[0] * calc_percent) / 100
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Percentage",
-            "description": f"{calc_percent}% of {resolved_inputs[0]}",
-            "inputs": resolved_inputs,
-            "calculation": f"{self._format_number(resolved_inputs[0])} × {calc_percent}%",
-            "result": result,
-        }
+        if not emit_breakdown:
+            return result, None
+        breakdown = _PERCENTAGE_BREAKDOWN.copy()
+        breakdown["step_id"] = step["id"]
+        breakdown["name"] = step_name
+        breakdown["description"] = f"{calc_percent}% of {resolved_inputs[0]}"
+        breakdown["inputs"] = resolved_inputs
+        breakdown["calculation"] = (
+            f"{self._format_number(resolved_inputs[0])} × {calc_percent}%"
+        )
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_round(
-        self, step: Step, step_name: str, resolved_inputs: List[Union[int, float]]
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        self,
+        step: Step,
+        step_name: str,
+        resolved_inputs: List[Union[int, float]],
+        emit_breakdown: bool,
+        places: Optional[int] = None,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process round to decimal places operation.
 
         Args:
             step: The step configuration (may include 'decimals' field)
             step_name: Human-readable name for the step
             resolved_inputs: One value (number to round) or two values (number, decimal places)
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
+            places: The step's 'decimals' field, when compiled as an int
 
         Returns:
             Tuple of (rounded_value, breakdown_entry)
@@ -835,43 +2437,53 @@ class PricingEngine:
             ValueError: If invalid number of inputs or missing decimals field
         """
         if len(resolved_inputs) == 1:
-            decimals = step.get("decimals")
-            if decimals is None:
-                raise ValueError(
-                    f"{step_name}: round requires decimals in step or two inputs"
-                )
+            if places is None:
+                decimals = step.get("decimals")
+                if decimals is None:
+                    raise ValueError(
+                        f"{step_name}: round requires decimals in step or two inputs"
+                    )
+                # OPTIMIZATION: Convert the decimal places once for the result
+                # and breakdown
+                places = int(decimals)
             value = resolved_inputs[0]
         elif len(resolved_inputs) == 2:
             value = resolved_inputs[0]
-            decimals = resolved_inputs[1]
+            places = int(resolved_inputs[1])
         else:
             raise ValueError(f"{step_name}: round allows only one or two inputs")
-        result = round(value, int(decimals))
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Round",
-            "description": f"Round {value} to {int(decimals)} decimal places",
-            "inputs": resolved_inputs,
-            "calculation": f"round({value}, {int(decimals)})",
-            "result": result,
-        }
+        if type(value) is int and places >= 0:
+            # OPTIMIZATION: Whole amounts are already exact to any decimal place
+            result = value
+        else:
+            result = round(value, places)
+        if not emit_breakdown:
+            return result, None
+        breakdown = _ROUND_BREAKDOWN.copy()
+        breakdown["step_id"] = step["id"]
+        breakdown["name"] = step_name
+        breakdown["description"] = f"Round {value} to {places} decimal places"
+        breakdown["inputs"] = resolved_inputs
+        breakdown["calculation"] = f"round({value}, {places})"
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_clamp(
         self,
-        step: Step,
+        step: _BoundClamp,
         step_name: str,
-        step_values: dict[int, Union[int, float]],
+        step_values: List[Union[int, float]],
         final_cost_by_path: dict[str, Union[int, float]],
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process clamp operation.
 
         Args:
-            step: The step configuration with value, min, and max fields
+            step: The compiled step with bound value, min, and max operands
             step_name: Human-readable name for the step
-            step_values: Dictionary of previously calculated step results
+            step_values: Results of previous steps by slot
             final_cost_by_path: Dictionary of calculated costs by path
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (clamped_value, breakdown_entry)
@@ -879,23 +2491,24 @@ class PricingEngine:
         Raises:
             ValueError: If min value is greater than max value
         """
-        value = self._resolve_value(
-            step.get("value", 0), step_values, final_cost_by_path
-        )
-        min_val = self._resolve_value(
-            step.get("min", 0), step_values, final_cost_by_path
-        )
-        max_val = self._resolve_value(
-            step.get("max", 0), step_values, final_cost_by_path
-        )
+        # OPTIMIZATION: Bind the resolver once for the three operands
+        resolve = self._resolve_value
+        value = resolve(step.value, step_values, final_cost_by_path)
+        min_val = resolve(step.min, step_values, final_cost_by_path)
+        max_val = resolve(step.max, step_values, final_cost_by_path)
 
         # Validate clamp parameters
-        if min_val > max_val:
+        if step.check_range and min_val > max_val:
             raise ValueError(
                 f"{step_name}: min value ({min_val}) cannot be greater than max value ({max_val})"
             )
 
-        result = max(min_val, min(max_val, value))
+        # OPTIMIZATION: Inline comparisons instead of calling min() and max();
+        # picks the same operand as max(min_val, min(max_val, value)) on ties
+        upper = value if value < max_val else max_val
+        result = upper if upper > min_val else min_val
+        if not emit_breakdown:
+            return result, None
 
         clamped = "not clamped"
         if value < min_val:
@@ -903,31 +2516,37 @@ class PricingEngine:
         elif value > max_val:
             clamped = f"clamped to maximum ({max_val})"
 
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Clamp",
-            "description": f"Clamp {value} between {min_val} and {max_val} - {clamped}",
-            "inputs": [value, min_val, max_val],
-            "calculation": f"clamp({self._format_number(value)}, {self._format_number(min_val)}, {self._format_number(max_val)})",
-            "result": result,
-        }
+        # OPTIMIZATION: Bind the formatter once for the three numbers
+        fmt = self._format_number
+        breakdown = _CLAMP_BREAKDOWN.copy()
+        breakdown["step_id"] = step.id
+        breakdown["name"] = step_name
+        breakdown["description"] = (
+            f"Clamp {value} between {min_val} and {max_val} - {clamped}"
+        )
+        breakdown["inputs"] = [value, min_val, max_val]
+        breakdown["calculation"] = (
+            f"clamp({fmt(value)}, {fmt(min_val)}, {fmt(max_val)})"
+        )
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_if(
         self,
-        step: Step,
+        step: _BoundIf,
         step_name: str,
-        step_values: dict[int, Union[int, float]],
+        step_values: List[Union[int, float]],
         final_cost_by_path: dict[str, Union[int, float]],
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process conditional (if) operation.
 
         Args:
-            step: The step configuration with condition, then, and else fields
+            step: The compiled step with bound condition, then, and else operands
             step_name: Human-readable name for the step
-            step_values: Dictionary of previously calculated step results
+            step_values: Results of previous steps by slot
             final_cost_by_path: Dictionary of calculated costs by path
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (conditional_result, breakdown_entry)
@@ -935,56 +2554,65 @@ class PricingEngine:
         Raises:
             ValueError: If unsupported operator is used
         """
-        condition = step.get("condition", {})
-
         # Resolve condition values
-        left_val = self._resolve_value(
-            condition.get("left"), step_values, final_cost_by_path
-        )
-        right_val = self._resolve_value(
-            condition.get("right"), step_values, final_cost_by_path
-        )
+        # OPTIMIZATION: Bind the resolver once for the four operands
+        resolve = self._resolve_value
+        left_val = resolve(step.left, step_values, final_cost_by_path)
+        right_val = resolve(step.right, step_values, final_cost_by_path)
 
         # Evaluate condition using operator mapping
-        operator = condition.get("operator", "==")
-        if operator not in self.OPERATORS:
-            raise ValueError(f"{step_name}: unsupported operator '{operator}'")
-        condition_result = self.OPERATORS[operator](left_val, right_val)
+        operator = step.operator
+        compare = step.compare
+        if compare is not None:
+            # OPTIMIZATION: Compiled conditions call the comparison bound from
+            # OPERATORS when compiled, without a table lookup
+            condition_result = compare(left_val, right_val)
+        else:
+            operators = self.OPERATORS
+            if operator not in operators:
+                raise ValueError(f"{step_name}: unsupported operator '{operator}'")
+            condition_result = operators[operator](left_val, right_val)
 
         # Resolve then/else values
-        then_val = self._resolve_value(
-            step.get("then", 0), step_values, final_cost_by_path
-        )
-        else_val = self._resolve_value(
-            step.get("else", 0), step_values, final_cost_by_path
-        )
+        then_val = resolve(step.then, step_values, final_cost_by_path)
+        else_val = resolve(step.otherwise, step_values, final_cost_by_path)
 
         # Set result based on condition
         result = then_val if condition_result else else_val
-
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Conditional",
-            "description": f"If {left_val} {operator} {right_val} then {then_val} else {else_val}",
-            "inputs": [left_val, right_val, then_val, else_val],
-            "calculation": f"{self._format_number(left_val)} {operator} {self._format_number(right_val)} → {'TRUE' if condition_result else 'FALSE'} → {self._format_number(result)}",
-            "result": result,
-        }
+        if not emit_breakdown:
+            return result, None
+
+        # OPTIMIZATION: Bind the formatter once for the three numbers
+        fmt = self._format_number
+        breakdown = _CONDITIONAL_BREAKDOWN.copy()
+        breakdown["step_id"] = step.id
+        breakdown["name"] = step_name
+        breakdown["description"] = (
+            f"If {left_val} {operator} {right_val} then {then_val} else {else_val}"
+        )
+        breakdown["inputs"] = [left_val, right_val, then_val, else_val]
+        breakdown["calculation"] = (
+            f"{fmt(left_val)} {operator} {fmt(right_val)} → {'TRUE' if condition_result else 'FALSE'} → {fmt(result)}"
+        )
+        breakdown["result"] = result
         return result, breakdown
 
     def _process_price(
         self,
         step: Step,
         step_name: str,
+        target_path: str,
         input_values: dict[str, Any],
-    ) -> Tuple[Union[int, float], BreakdownEntry]:
+        emit_breakdown: bool,
+    ) -> Tuple[Union[int, float], Optional[BreakdownEntry]]:
         """Process price operation (explicit input * cost calculation).
 
         Args:
             step: The step configuration
             step_name: Human-readable name for the step
+            target_path: The step's input path, validated when compiling
             input_values: Dictionary of raw input values by path
+            emit_breakdown: Build the breakdown entry, otherwise return None for it
 
         Returns:
             Tuple of (calculated_cost, breakdown_entry)
@@ -992,14 +2620,6 @@ class PricingEngine:
         Raises:
             ValueError: If input path not found or node missing
         """
-        inputs_list = step.get("inputs", [])
-        if not inputs_list:
-            raise ValueError(f"{step_name}: price mode requires one input path")
-
-        target_path = inputs_list[0]
-        if not isinstance(target_path, str):
-            raise ValueError(f"{step_name}: price mode input must be a path string")
-
         # Handle wildcards if present (though typically price mode targets specific inputs)
         # For now, let's assume direct path or resolve wildcard to single path if needed?
         # The user req says "take only the pricing node".
@@ -1013,9 +2633,9 @@ class PricingEngine:
             # Usually "price" implies calculating cost of an INPUT.
             # If input is missing, maybe cost is 0?
             # For now, let's assume it must exist or we error/return 0.
-            if target_path in self.numeric_nodes or any(
-                target_path == k[0] for k in self.label_nodes
-            ):
+            # OPTIMIZATION: Every indexed node is numeric or label, so a path
+            # lookup replaces a scan over all label nodes
+            if target_path in self.nodes_by_path:
                 # Node exists but no input value provided.
                 # If numeric, value is effectively 0 or None?
                 # Let's assume 0 for check.
@@ -1027,50 +2647,60 @@ class PricingEngine:
 
         # Find the pricing node
         # Try numeric first
-        calculation_desc = ""
-        result = 0
-
-        # Re-implementing the logic cleanly to handle both lookups and formatting
-        # Numeric lookup
-        node_numeric = self.numeric_nodes.get(target_path)
-        # Label lookup
-        node_label = self.label_nodes.get((target_path, raw_value))
-
-        node = node_numeric or node_label
-
-        if not node:
-            raise ValueError(f"{step_name}: No pricing node found for '{target_path}'")
-
-        cost_per_unit = node["cost"]
-        unit = node.get("unit", "")
-        currency = node.get("currency", "")
-
-        if node["type"] == "numeric":
-            if not isinstance(raw_value, (int, float)):
+        # OPTIMIZATION: The index a node is found in fixes its type, so numeric
+        # and label nodes are priced on separate branches without reading it
+        node = self.numeric_nodes.get(target_path)
+        is_numeric = bool(node)
+        if is_numeric:
+            cost_per_unit = node["cost"]
+            # Inputs on numeric paths were checked when pricing them, but a
+            # value matching a label node of the same path still gets here
+            value_type = type(raw_value)
+            if (
+                value_type is not int
+                and value_type is not float
+                and not isinstance(raw_value, (int, float))
+            ):
                 if raw_value is None:
                     raw_value = 0
-                elif not isinstance(raw_value, (int, float)):
+                else:
                     raise ValueError(
                         f"{step_name}: Invalid numeric value '{raw_value}'"
                     )
             result = raw_value * cost_per_unit
-            # Format: "2 cm3 * 20 INR" or "2 * 20"
-            part1 = f"{self._format_number(raw_value)} {unit}".strip()
-            part2 = f"{self._format_number(cost_per_unit)} {currency}".strip()
-            calculation_desc = f"{part1} * {part2}"
         else:
             # Label
+            # The label lookup only runs without a numeric node. Input values
+            # were already hashed when pricing the inputs, so it can't raise on
+            # a value it would otherwise have skipped.
+            path_labels = self._labels_by_path.get(target_path)
+            node = path_labels.get(raw_value) if path_labels is not None else None
+            if not node:
+                raise ValueError(
+                    f"{step_name}: No pricing node found for '{target_path}'"
+                )
+            cost_per_unit = node["cost"]
             result = cost_per_unit
-            part2 = f"{self._format_number(cost_per_unit)} {currency}".strip()
+        if not emit_breakdown:
+            return result, None
+
+        unit = node.get("unit", "")
+        currency = node.get("currency", "")
+        # OPTIMIZATION: Bind the formatter once for both numbers
+        fmt = self._format_number
+        part2 = f"{fmt(cost_per_unit)} {currency}".strip()
+        if is_numeric:
+            # Format: "2 cm3 * 20 INR" or "2 * 20"
+            part1 = f"{fmt(raw_value)} {unit}".strip()
+            calculation_desc = f"{part1} * {part2}"
+        else:
             calculation_desc = f"{part2} (fixed cost)"
 
-        breakdown = {
-            "step_id": step["id"],
-            "name": step_name,
-            "operation": "Price Calculation",
-            "description": f"Calculate cost for {target_path}",
-            "inputs": [raw_value],
-            "calculation": calculation_desc,
-            "result": result,
-        }
+        breakdown = _PRICE_CALCULATION_BREAKDOWN.copy()
+        breakdown["step_id"] = step["id"]
+        breakdown["name"] = step_name
+        breakdown["description"] = f"Calculate cost for {target_path}"
+        breakdown["inputs"] = [raw_value]
+        breakdown["calculation"] = calculation_desc
+        breakdown["result"] = result
         return result, breakdown
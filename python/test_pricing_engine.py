@@ -0,0 +1,494 @@
+"""Checks each engine entry point against a plain ``calculate`` on main.py's fixture.
+
+Run with ``python -m unittest`` from this directory.
+"""
+
+import contextlib
+import copy
+import io
+import unittest
+from types import MappingProxyType
+from unittest import mock
+
+from pricing_engine import (
+    Node,
+    PricingEngine,
+    ValidationError,
+    _compile_selector,
+    compile_selectors,
+)
+
+try:
+    import pyarrow
+except ImportError:  # Optional; only the Arrow catalog test needs it
+    pyarrow = None
+
+# main.py prints its result when imported
+with contextlib.redirect_stdout(io.StringIO()):
+    import main
+
+
+def _thaw(value):
+    """Return a plain dict/list copy of a frozen main.py config."""
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+NODES = _thaw(main.PRICING_NODES)
+STRATEGY = _thaw(main.PRICING_STRATEGY)
+INPUTS = [{"path": path, "value": value} for path, value in main.INPUTS.items()]
+
+# A second request, priced differently from INPUTS
+OTHER_INPUTS = [
+    {"path": "/volume", "value": 5},
+    {"path": "/time_taken", "value": 3},
+    {"path": "/material/resin/color", "value": "red"},
+]
+
+
+def reference(inputs=INPUTS, strategy=STRATEGY, nodes=NODES):
+    """Price a request with a new engine and plain, uncompiled configuration."""
+    return PricingEngine().calculate(
+        copy.deepcopy(nodes), copy.deepcopy(strategy), copy.deepcopy(inputs)
+    )
+
+
+class EntryPointTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = reference()
+
+    def test_main_fixture(self):
+        self.assertEqual(main.result_output, self.expected)
+
+    def test_repeated_calculate(self):
+        engine = PricingEngine()
+        for _ in range(3):
+            self.assertEqual(engine.calculate(NODES, STRATEGY, INPUTS), self.expected)
+        self.assertEqual(
+            engine.calculate(NODES, STRATEGY, OTHER_INPUTS), reference(OTHER_INPUTS)
+        )
+
+    def test_cache_steps(self):
+        engine = PricingEngine(cache_steps=True)
+        for _ in range(2):
+            self.assertEqual(engine.calculate(NODES, STRATEGY, INPUTS), self.expected)
+        self.assertEqual(
+            engine.calculate(NODES, STRATEGY, OTHER_INPUTS), reference(OTHER_INPUTS)
+        )
+        engine.invalidate("/volume")
+        self.assertEqual(engine.calculate(NODES, STRATEGY, INPUTS), self.expected)
+        engine.invalidate()
+        self.assertEqual(engine.calculate(NODES, STRATEGY, INPUTS), self.expected)
+
+    def test_validate(self):
+        engine = PricingEngine()
+        self.assertIsNone(engine.validate(NODES, STRATEGY, INPUTS))
+
+        missing = [item for item in INPUTS if item["path"] != "/time_taken"]
+        error = engine.validate(NODES, STRATEGY, missing)
+        self.assertIsInstance(error, ValidationError)
+        with self.assertRaises(ValueError) as raised:
+            engine.calculate(NODES, STRATEGY, missing)
+        self.assertEqual(error.message, str(raised.exception))
+
+    def test_try_calculate(self):
+        engine = PricingEngine()
+        self.assertEqual(engine.try_calculate(NODES, STRATEGY, INPUTS), self.expected)
+
+        missing = [item for item in INPUTS if item["path"] != "/time_taken"]
+        error = engine.try_calculate(NODES, STRATEGY, missing)
+        self.assertIsInstance(error, ValidationError)
+        self.assertEqual(error, engine.validate(NODES, STRATEGY, missing))
+
+        divide = {
+            "version": 1,
+            "steps": [{"id": 1, "mode": "divide", "inputs": ["/volume", 0]}],
+        }
+        error = engine.try_calculate(NODES, divide, INPUTS)
+        with self.assertRaises(ValueError) as raised:
+            engine.calculate(NODES, divide, INPUTS)
+        self.assertEqual(error, ValidationError(str(raised.exception)))
+
+    def test_calculate_batch(self):
+        results = PricingEngine().calculate_batch(
+            NODES, STRATEGY, [INPUTS, OTHER_INPUTS, INPUTS]
+        )
+        self.assertEqual(
+            results, [self.expected, reference(OTHER_INPUTS), self.expected]
+        )
+
+    def test_compile_strategy_and_selectors(self):
+        engine = PricingEngine()
+        for strategy in (
+            compile_selectors(STRATEGY),
+            engine.compile_strategy(STRATEGY),
+            engine.compile_strategy(compile_selectors(STRATEGY)),
+        ):
+            self.assertEqual(engine.calculate(NODES, strategy, INPUTS), self.expected)
+
+    def test_frozen_config(self):
+        engine = PricingEngine()
+        for _ in range(2):
+            self.assertEqual(
+                engine.calculate(main.PRICING_NODES, main.PRICING_STRATEGY, INPUTS),
+                self.expected,
+            )
+
+    def test_node_records(self):
+        nodes = [Node.from_mapping(node) for node in NODES]
+        self.assertEqual(
+            PricingEngine().calculate(nodes, STRATEGY, INPUTS), self.expected
+        )
+        self.assertEqual(
+            PricingEngine().calculate(tuple(nodes), STRATEGY, INPUTS), self.expected
+        )
+
+    def test_node_columns(self):
+        columns = {
+            name: [node.get(name) for node in NODES]
+            for name in ("path", "type", "cost", "value", "unit", "currency")
+        }
+        self.assertEqual(
+            PricingEngine().calculate(columns, STRATEGY, INPUTS), self.expected
+        )
+
+    def test_node_columns_of_different_lengths(self):
+        columns = {
+            "path": ["/volume", "/weight"],
+            "type": ["numeric", "numeric"],
+            "cost": [2],
+        }
+        with self.assertRaisesRegex(ValueError, "column 'cost' has 1 entries"):
+            PricingEngine().calculate(columns, STRATEGY, INPUTS)
+
+    def test_node_mapping(self):
+        nodes = {index: node for index, node in enumerate(NODES)}
+        self.assertEqual(
+            PricingEngine().calculate(nodes, STRATEGY, INPUTS), self.expected
+        )
+
+    def test_input_mapping(self):
+        inputs = {item["path"]: item["value"] for item in INPUTS}
+        self.assertEqual(
+            PricingEngine().calculate(NODES, STRATEGY, inputs), self.expected
+        )
+
+    def test_without_breakdown(self):
+        result = PricingEngine().calculate(
+            NODES, STRATEGY, INPUTS, return_breakdown=False
+        )
+        self.assertEqual(
+            result, {"final_price": self.expected["final_price"], "breakdown": []}
+        )
+
+    def test_breakdown_flag_per_call(self):
+        engine = PricingEngine()
+
+        def inputs_batch():
+            # Another call on the same engine while the batch is running
+            for _ in range(2):
+                self.assertEqual(
+                    engine.calculate(NODES, STRATEGY, INPUTS), self.expected
+                )
+                yield INPUTS
+
+        results = engine.calculate_batch(
+            NODES, STRATEGY, inputs_batch(), return_breakdown=False
+        )
+        fast = {"final_price": self.expected["final_price"], "breakdown": []}
+        self.assertEqual(results, [fast, fast])
+        with self.assertRaises(ValueError):
+            engine.calculate(NODES, STRATEGY, [], return_breakdown=False)
+        self.assertEqual(engine.calculate(NODES, STRATEGY, INPUTS), self.expected)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrow_table(self):
+        table = pyarrow.Table.from_pylist(NODES)
+        self.assertEqual(
+            PricingEngine().calculate(table, STRATEGY, INPUTS), self.expected
+        )
+
+
+class WildcardTest(unittest.TestCase):
+    # A selector regex ends in "$", which also matches before a final newline,
+    # so "/size/*/cost" matches the paths ending in "\n" as well
+    NODES = [
+        {"path": "/size/a/cost\n", "value": None, "type": "numeric", "cost": 10},
+        {"path": "/size/b/cost", "value": None, "type": "numeric", "cost": 1},
+        {"path": "/size/c/cost\n", "value": "x", "type": "label", "cost": 100},
+    ]
+    STRATEGY = {
+        "version": 1,
+        "steps": [{"id": 1, "mode": "add", "inputs": ["/size/*/cost"]}],
+    }
+    INPUTS = [
+        {"path": "/size/a/cost\n", "value": 2},
+        {"path": "/size/b/cost", "value": 3},
+        {"path": "/size/c/cost\n", "value": "x"},
+    ]
+
+    def test_trailing_newline_through_trie(self):
+        engine = PricingEngine()
+        nodes = tuple(map(Node.from_mapping, self.NODES))
+        engine.precompute_indexes(nodes)
+        # Catalogs whose indexes are reused resolve selectors through the trie
+        for _ in range(2):
+            result = engine.calculate(nodes, self.STRATEGY, self.INPUTS)
+            self.assertEqual(result["breakdown"][0]["inputs"], [20, 3, 100])
+
+    def test_trailing_newline_through_string_match(self):
+        # List catalogs are re-indexed, so selectors are matched against the
+        # input paths with the prefix/suffix comparison
+        result = PricingEngine().calculate(self.NODES, self.STRATEGY, self.INPUTS)
+        self.assertEqual(result["breakdown"][0]["inputs"], [20, 3, 100])
+        selector = _compile_selector("/size/*/cost")
+        self.assertIsNotNone(selector.prefix)
+        self.assertEqual(
+            [selector.match(item["path"]) for item in self.INPUTS], [True] * 3
+        )
+        self.assertFalse(selector.match("/size/a/cost\n\n"))
+
+
+class RequiredInputsTest(unittest.TestCase):
+    def strategy(self, *required_inputs):
+        return {**STRATEGY, "required_inputs": list(required_inputs)}
+
+    def test_one_path_satisfies_two_patterns(self):
+        # The combined regex only reports the first matching pattern for
+        # /material/resin/color; the second is checked on its own
+        strategy = self.strategy("/material/*/color", "/material/resin/*", "/volume")
+        engine = PricingEngine()
+        self.assertIsNone(engine.validate(NODES, strategy, INPUTS))
+        self.assertEqual(engine.calculate(NODES, strategy, INPUTS), reference())
+
+    def test_unmatched_second_pattern(self):
+        strategy = self.strategy("/material/*/color", "/material/pla/*")
+        with self.assertRaisesRegex(
+            ValueError, "Required input '/material/pla/\\*' is missing"
+        ):
+            PricingEngine().calculate(NODES, strategy, INPUTS)
+
+
+class StepCacheTest(unittest.TestCase):
+    NODES = [{"path": "/volume", "value": None, "type": "numeric", "cost": 10}]
+    STRATEGY = {
+        "version": 1,
+        "steps": [{"id": 1, "mode": "add", "inputs": ["/volume"]}],
+    }
+
+    def test_least_recently_used_eviction(self):
+        class Engine(PricingEngine):
+            _STEP_CACHE_SIZE = 3
+
+        engine = Engine(cache_steps=True)
+        with mock.patch.object(
+            Engine, "_process_add", autospec=True, side_effect=Engine._process_add
+        ) as process_add:
+            # Volume 1 is read again before 4 is added, so 2 is evicted
+            for volume, computed in (
+                (1, 1),
+                (2, 1),
+                (3, 1),
+                (1, 0),
+                (4, 1),
+                (1, 0),
+                (2, 1),
+            ):
+                calls = process_add.call_count
+                result = engine.calculate(
+                    self.NODES, self.STRATEGY, {"/volume": volume}
+                )
+                self.assertEqual(result["final_price"], volume * 10)
+                self.assertEqual(process_add.call_count - calls, computed, volume)
+                self.assertLessEqual(len(engine._step_cache), Engine._STEP_CACHE_SIZE)
+
+
+class ConstantFoldingTest(unittest.TestCase):
+    NODES = [{"path": "/volume", "value": None, "type": "numeric", "cost": 10}]
+    INPUTS = [{"path": "/volume", "value": 2}]
+    # Steps 1-3 only read constants and each other, so they are folded
+    STRATEGY = {
+        "version": 1,
+        "steps": [
+            {"id": 1, "mode": "multiply", "inputs": [2.5, 1.333]},
+            {"id": 2, "mode": "add", "inputs": ["step__1", 1]},
+            {"id": 3, "mode": "percentage", "inputs": ["step__2", 15]},
+            {"id": 4, "mode": "add", "inputs": ["step__3", "/volume"]},
+        ],
+    }
+
+    def unfolded(self, strategy, calc_rounding_decimals=2):
+        """Calculate with constant folding turned off."""
+        with mock.patch.object(
+            PricingEngine, "_fold_step", lambda engine, op, slot, constants: op
+        ):
+            return PricingEngine(calc_rounding_decimals).calculate(
+                self.NODES, strategy, self.INPUTS
+            )
+
+    def test_constant_chain(self):
+        with mock.patch.object(
+            PricingEngine,
+            "_fold_step",
+            autospec=True,
+            side_effect=PricingEngine._fold_step,
+        ) as fold_step:
+            result = PricingEngine().calculate(self.NODES, self.STRATEGY, self.INPUTS)
+        self.assertEqual(fold_step.call_count, 3)
+        self.assertEqual(result, self.unfolded(self.STRATEGY))
+
+    def test_shared_compiled_strategy_rounding(self):
+        compiled = PricingEngine().compile_strategy(self.STRATEGY)
+        for decimals in (2, 0, 2, -1):
+            result = PricingEngine(calc_rounding_decimals=decimals).calculate(
+                self.NODES, compiled, self.INPUTS
+            )
+            self.assertEqual(result, self.unfolded(self.STRATEGY, decimals))
+
+    def test_constant_step_raises_in_order(self):
+        strategy = {
+            "version": 1,
+            "required_inputs": ["/volume"],
+            "steps": [
+                {"id": 1, "mode": "add", "inputs": ["/volume"]},
+                {"id": 2, "mode": "divide", "inputs": [1, 0]},
+            ],
+        }
+        engine = PricingEngine()
+        with self.assertRaisesRegex(ValueError, "Required input '/volume'"):
+            engine.calculate(self.NODES, strategy, [])
+        with self.assertRaisesRegex(ValueError, "Step 2: division by zero"):
+            engine.calculate(self.NODES, strategy, self.INPUTS)
+
+        strategy["steps"][0]["mode"] = "bogus"
+        with self.assertRaisesRegex(ValueError, "Unknown mode: bogus"):
+            engine.calculate(self.NODES, strategy, self.INPUTS)
+
+
+class RegressionTest(unittest.TestCase):
+    NODES = [
+        {"path": "/volume", "value": None, "type": "numeric", "cost": 10},
+        {"path": "/weight", "value": None, "type": "numeric", "cost": 1},
+        {"path": "/time_taken", "value": None, "type": "numeric", "cost": 100},
+    ]
+    INPUTS = [{"path": "/volume", "value": 2}]
+
+    def test_strategy_edited_in_place(self):
+        engine = PricingEngine()
+        strategy = {
+            "version": 1,
+            "steps": [{"id": 1, "mode": "add", "inputs": ["/volume"]}],
+        }
+        self.assertEqual(
+            engine.calculate(self.NODES, strategy, self.INPUTS)["final_price"], 20
+        )
+        strategy["steps"][0]["inputs"].append(100)
+        self.assertEqual(
+            engine.calculate(self.NODES, strategy, self.INPUTS)["final_price"], 120
+        )
+
+    def test_read_only_strategy_edited_through_its_dict(self):
+        engine = PricingEngine()
+        step = {"id": 1, "mode": "add", "inputs": ("/volume",)}
+        strategy = MappingProxyType({"version": 1, "steps": (MappingProxyType(step),)})
+        self.assertEqual(
+            engine.calculate(self.NODES, strategy, self.INPUTS)["final_price"], 20
+        )
+        step["inputs"] = ("/volume", 100)
+        self.assertEqual(
+            engine.calculate(self.NODES, strategy, self.INPUTS)["final_price"], 120
+        )
+
+    def test_dict_catalog_edited_in_place(self):
+        engine = PricingEngine()
+        nodes = {"volume": self.NODES[0]}
+        strategy = {
+            "version": 1,
+            "steps": [{"id": 1, "mode": "add", "inputs": ["/v*"]}],
+        }
+        engine.precompute_indexes(nodes)
+        self.assertEqual(
+            engine.calculate(nodes, strategy, self.INPUTS)["final_price"], 20
+        )
+        nodes["vat"] = {"path": "/vat", "value": None, "type": "numeric", "cost": 3}
+        inputs = self.INPUTS + [{"path": "/vat", "value": 1}]
+        self.assertEqual(engine.calculate(nodes, strategy, inputs)["final_price"], 23)
+
+    def test_list_catalog_element_replaced(self):
+        engine = PricingEngine()
+        nodes = list(self.NODES)
+        strategy = {
+            "version": 1,
+            "steps": [{"id": 1, "mode": "add", "inputs": ["/weight"]}],
+        }
+        inputs = [{"path": "/weight", "value": 5}]
+        self.assertEqual(engine.calculate(nodes, strategy, inputs)["final_price"], 5)
+        nodes[1] = {"path": "/weight", "value": None, "type": "numeric", "cost": 10}
+        self.assertEqual(engine.calculate(nodes, strategy, inputs)["final_price"], 50)
+
+    def test_tuple_catalog_node_edited(self):
+        engine = PricingEngine()
+        nodes = tuple(dict(node) for node in NODES)
+        self.assertEqual(engine.calculate(nodes, STRATEGY, INPUTS), reference())
+        nodes[4]["value"] = "green"
+        inputs = [dict(item) for item in INPUTS]
+        inputs[2]["value"] = "green"
+        self.assertEqual(
+            engine.calculate(nodes, STRATEGY, inputs),
+            reference(inputs, nodes=list(nodes)),
+        )
+
+    def test_str_subclass_step_reference(self):
+        class Operand(str):
+            pass
+
+        strategy = {
+            "version": 1,
+            "steps": [
+                {"id": 1, "mode": "add", "inputs": [Operand("/volume")]},
+                {"id": 2, "mode": "multiply", "inputs": [Operand("step__1"), 3]},
+            ],
+        }
+        result = PricingEngine().calculate(self.NODES, strategy, self.INPUTS)
+        self.assertEqual(result["final_price"], 60)
+
+    def test_overridden_operator(self):
+        class Engine(PricingEngine):
+            OPERATORS = {**PricingEngine.OPERATORS, "==": lambda a, b: abs(a - b) < 1}
+
+        strategy = {
+            "version": 1,
+            "steps": [
+                {"id": 1, "mode": "add", "inputs": ["/volume"]},
+                {
+                    "id": 2,
+                    "mode": "if",
+                    "condition": {"left": "step__1", "operator": "==", "right": 20.5},
+                    "then": 1,
+                    "else": 2,
+                },
+            ],
+        }
+        result = Engine().calculate(self.NODES, strategy, self.INPUTS)
+        self.assertEqual(result["final_price"], 1)
+
+        engine = PricingEngine()
+        self.assertEqual(
+            engine.calculate(self.NODES, strategy, self.INPUTS)["final_price"], 2
+        )
+        engine.OPERATORS = {**PricingEngine.OPERATORS, "==": lambda a, b: True}
+        self.assertEqual(
+            engine.calculate(self.NODES, strategy, self.INPUTS)["final_price"], 1
+        )
+        self.assertEqual(engine.calculate(main.NODES, STRATEGY, INPUTS), reference())
+        engine.OPERATORS = {**PricingEngine.OPERATORS, ">": lambda a, b: False}
+        self.assertEqual(
+            engine.calculate(main.NODES, STRATEGY, INPUTS)["final_price"], 50
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()